@@ -7,7 +7,14 @@ context, and returns stable, machine-consumable incident objects.
 
 from __future__ import annotations
 
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from itertools import chain
+from operator import attrgetter, itemgetter
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from src.anomaly.schema import AnomalyEvent, FeatureAnomaly
@@ -16,6 +23,73 @@ from src.data.schema import LogEntry
 from .config import IncidentConfig
 from .schema import Incident, LogPattern, MetricsSummary, OperationalEvent
 
+# Sort keys built with attrgetter so key extraction runs in C, once per item.
+_WINDOW_ORDER = attrgetter("window_start", "detected_at")
+_TIMESTAMP = attrgetter("timestamp")
+
+
+def _build_service_incidents(
+    config: IncidentConfig,
+    events: List[AnomalyEvent],
+    logs: Optional[List[LogEntry]],
+    operational_events: Optional[List[OperationalEvent]],
+) -> List[Incident]:
+    """Process-pool entry point: build incidents for one service's sorted events."""
+
+    logs_by_service = {events[0].service: logs} if logs else None
+    return IncidentBuilder(config)._build_partitions([events], logs_by_service, operational_events)
+
+
+@dataclass
+class _TimeIndex:
+    """
+    Items (logs or operational events) sorted by their timestamp.
+
+    Lets each incident bisect its context window instead of scanning and
+    re-sorting every item.
+    """
+
+    timestamps: List[datetime]
+    items: List
+
+    @classmethod
+    def build(cls, items: Iterable) -> "_TimeIndex":
+        ordered = sorted(items, key=_TIMESTAMP)
+        return cls(timestamps=[item.timestamp for item in ordered], items=ordered)
+
+    def span(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """Return the [lo, hi) index range with start <= timestamp <= end."""
+        lo = bisect_left(self.timestamps, start)
+        return lo, bisect_right(self.timestamps, end, lo=lo)
+
+    def between(self, start: datetime, end: datetime) -> List:
+        """Return items with start <= timestamp <= end, in time order."""
+        lo, hi = self.span(start, end)
+        return self.items[lo:hi]
+
+
+@dataclass
+class _LogIndex(_TimeIndex):
+    """
+    Time-sorted logs with their pattern keys and messages as parallel columns.
+
+    Keys are resolved once per log rather than once per incident window the
+    log falls into.
+    """
+
+    keys: List[str]
+    messages: List[str]
+
+    @classmethod
+    def build(cls, items: Iterable[LogEntry]) -> "_LogIndex":
+        ordered = sorted(items, key=_TIMESTAMP)
+        return cls(
+            timestamps=[log.timestamp for log in ordered],
+            items=ordered,
+            keys=[str(log.metadata.get("message_hash") or log.message) for log in ordered],
+            messages=[log.message for log in ordered],
+        )
+
 
 class IncidentBuilder:
     """
@@ -34,6 +108,11 @@ class IncidentBuilder:
 
     def __init__(self, config: Optional[IncidentConfig] = None) -> None:
         self.config = config or IncidentConfig()
+        # One bit per distinct feature family, assigned on first sight.
+        self._family_bits: Dict[str, int] = {}
+        # Config is fixed for the builder's lifetime; build the deltas once.
+        self._context_delta = timedelta(seconds=self.config.context_window_seconds)
+        self._window_delta = timedelta(seconds=self.config.window_size_seconds)
 
     def build_incidents(
         self,
@@ -52,39 +131,108 @@ class IncidentBuilder:
         Returns:
             List of Incident objects, sorted by service and start_time.
         """
-        events = sorted(
-            anomaly_events,
-            key=lambda e: (e.service, e.window_start, e.detected_at),
-        )
+        # Bucket by service in one pass and sort each bucket by time; cheaper
+        # than sorting the mixed stream and keeps each service contiguous.
+        buckets: Dict[str, List[AnomalyEvent]] = defaultdict(list)
+        for event in anomaly_events:
+            buckets[event.service].append(event)
+        if not buckets:
+            return []
 
-        incidents: List[Incident] = []
-        current_group: List[AnomalyEvent] = []
-
-        def flush_group() -> None:
-            if not current_group:
-                return
-            incident = self._build_incident(current_group, logs_by_service, operational_events)
-            incidents.append(incident)
-            current_group.clear()
-
-        for event in events:
-            if not current_group:
-                current_group.append(event)
-                continue
-
-            if self._should_group(current_group, event):
-                current_group.append(event)
-            else:
-                flush_group()
-                current_group.append(event)
+        partitions = []
+        for service in sorted(buckets):
+            service_events = buckets[service]
+            service_events.sort(key=_WINDOW_ORDER)
+            partitions.append(service_events)
 
-        flush_group()
+        # Partitions are in service order and each yields incidents in
+        # start_time order, so the result needs no final sort.
+        if self.config.max_workers > 1 and len(partitions) > 1:
+            return self._build_parallel(partitions, logs_by_service, operational_events)
+        return self._build_partitions(partitions, logs_by_service, operational_events)
 
-        incidents.sort(key=lambda i: (i.service, i.start_time))
+    def _build_partitions(
+        self,
+        partitions: List[List[AnomalyEvent]],
+        logs_by_service: Optional[Dict[str, List[LogEntry]]],
+        operational_events: Optional[List[OperationalEvent]],
+    ) -> List[Incident]:
+        """Build incidents from per-service, time-sorted event lists."""
+
+        log_index = self._index_logs(logs_by_service, [events[0].service for events in partitions])
+        op_index = _TimeIndex.build(operational_events) if operational_events else None
+
+        incidents: List[Incident] = []
+        for events in partitions:
+            # Resolve each event's feature families once as a bitmask; grouping
+            # then only needs a running OR per group instead of rescanning it.
+            masks = [self._event_family_mask(event) for event in events]
+            boundaries = self._group_boundaries(events, masks)
+            incidents.extend(
+                self._build_incident(events[lo:hi], log_index, op_index)
+                for lo, hi in zip(boundaries, boundaries[1:])
+            )
         return incidents
 
-    def _should_group(self, group: List[AnomalyEvent], event: AnomalyEvent) -> bool:
-        last_event = group[-1]
+    def _build_parallel(
+        self,
+        partitions: List[List[AnomalyEvent]],
+        logs_by_service: Optional[Dict[str, List[LogEntry]]],
+        operational_events: Optional[List[OperationalEvent]],
+    ) -> List[Incident]:
+        """
+        Build each service's incidents in a separate process.
+
+        Services never share an incident, so each worker only receives its own
+        events and logs. Worth it only when per-service work outweighs the cost
+        of pickling events and incidents across processes.
+        """
+
+        logs_by_service = logs_by_service or {}
+        workers = min(self.config.max_workers, len(partitions))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _build_service_incidents,
+                    self.config,
+                    service_events,
+                    logs_by_service.get(service_events[0].service),
+                    operational_events,
+                )
+                for service_events in partitions
+            ]
+            return list(chain.from_iterable(future.result() for future in futures))
+
+    def _group_boundaries(self, events: List[AnomalyEvent], masks: List[int]) -> List[int]:
+        """
+        Compute group boundaries for sorted events in a single pass.
+
+        Returns the start index of every group followed by len(events), so
+        consecutive pairs delimit each group's slice.
+        """
+
+        boundaries = [0]
+        group_mask = masks[0]
+        for idx in range(1, len(events)):
+            event_mask = masks[idx]
+            if self._should_group(events[idx - 1], events[idx], group_mask, event_mask):
+                group_mask |= event_mask
+            else:
+                boundaries.append(idx)
+                group_mask = event_mask
+        boundaries.append(len(events))
+        return boundaries
+
+    def _should_group(
+        self,
+        last_event: AnomalyEvent,
+        event: AnomalyEvent,
+        group_mask: int,
+        event_mask: int,
+    ) -> bool:
+        if event.service != last_event.service:
+            return False
+
         gap = (event.window_start - last_event.window_start).total_seconds()
         if gap > self.config.max_gap_seconds:
             return False
@@ -92,37 +240,54 @@ class IncidentBuilder:
         if not self.config.require_feature_family_overlap:
             return True
 
-        group_families = self._event_family_set(group)
-        event_families = self._event_family_set([event])
-        return len(group_families & event_families) > 0
+        return (group_mask & event_mask) != 0
 
-    def _event_family_set(self, events: List[AnomalyEvent]) -> set:
-        families = set()
-        for event in events:
-            for anomaly in event.anomalies:
-                family = self.config.feature_families.get(anomaly.feature, "other")
-                families.add(family)
-        return families
+    def _index_logs(
+        self,
+        logs_by_service: Optional[Dict[str, List[LogEntry]]],
+        services: Iterable[str],
+    ) -> Dict[str, _LogIndex]:
+        if not logs_by_service:
+            return {}
+        return {
+            service: _LogIndex.build(logs_by_service[service])
+            for service in services
+            if service in logs_by_service
+        }
+
+    def _event_family_mask(self, event: AnomalyEvent) -> int:
+        family_of = self.config.feature_families.get
+        bits = self._family_bits
+        mask = 0
+        for anomaly in event.anomalies:
+            family = family_of(anomaly.feature, "other")
+            bit = bits.get(family)
+            if bit is None:
+                bit = bits[family] = 1 << len(bits)
+            mask |= bit
+        return mask
 
     def _build_incident(
         self,
         events: List[AnomalyEvent],
-        logs_by_service: Optional[Dict[str, List[LogEntry]]],
-        operational_events: Optional[List[OperationalEvent]],
+        log_index: Dict[str, _LogIndex],
+        op_index: Optional[_TimeIndex],
     ) -> Incident:
         service = events[0].service
         start_time, end_time = self._incident_time_bounds(events)
-        anomalies_sorted = sorted(events, key=lambda e: (e.window_start, e.detected_at))
 
         metrics_summary = self._metrics_summary(events)
-        log_patterns = self._derive_log_patterns(service, start_time, end_time, logs_by_service)
-        op_context = self._derive_operational_context(start_time, end_time, operational_events)
+        log_patterns = self._derive_log_patterns(service, start_time, end_time, log_index)
+        op_context = self._derive_operational_context(start_time, end_time, op_index)
 
-        return Incident(
+        # Every field is built above from validated inputs; only the
+        # incident_id default is left for pydantic to fill in.
+        return Incident.model_construct(
             service=service,
             start_time=start_time,
             end_time=end_time,
-            anomalies=anomalies_sorted,
+            # Groups are slices of a time-sorted service partition, so already in order.
+            anomalies=events,
             metrics_summary=metrics_summary,
             log_patterns=log_patterns,
             operational_context=op_context,
@@ -131,24 +296,19 @@ class IncidentBuilder:
     def _incident_time_bounds(self, events: List[AnomalyEvent]) -> Tuple[datetime, datetime]:
         start = min(e.window_start for e in events)
         end = max(e.window_start for e in events)
-        end = end + timedelta(seconds=self.config.window_size_seconds)
+        end = end + self._window_delta
         return start, end
 
     def _metrics_summary(self, events: List[AnomalyEvent]) -> MetricsSummary:
-        severities: Dict[str, int] = {}
-        features = set()
-        max_score = 0.0
-
-        for event in events:
-            max_score = max(max_score, event.score)
-            for anomaly in event.anomalies:
-                features.add(anomaly.feature)
-                key = anomaly.severity
-                severities[key] = severities.get(key, 0) + 1
-
-        return MetricsSummary(
+        max_score = max((event.score for event in events), default=0.0)
+        anomalies = [anomaly for event in events for anomaly in event.anomalies]
+        features = {anomaly.feature for anomaly in anomalies}
+        severities = dict(Counter(anomaly.severity for anomaly in anomalies))
+
+        # Inputs are already-validated AnomalyEvents; skip re-validation.
+        return MetricsSummary.model_construct(
             anomaly_count=len(events),
-            feature_count=len(features) if features else 1,
+            feature_count=len(features) or 1,
             max_score=max_score,
             severity_counts=severities,
         )
@@ -158,44 +318,41 @@ class IncidentBuilder:
         service: str,
         start_time: datetime,
         end_time: datetime,
-        logs_by_service: Optional[Dict[str, List[LogEntry]]],
+        log_index: Dict[str, _LogIndex],
     ) -> List[LogPattern]:
-        if not logs_by_service or service not in logs_by_service:
+        service_logs = log_index.get(service)
+        if service_logs is None:
             return []
 
-        context_start = start_time - timedelta(seconds=self.config.context_window_seconds)
-        context_end = end_time + timedelta(seconds=self.config.context_window_seconds)
-
-        patterns: Dict[str, LogPattern] = {}
-        for log in logs_by_service[service]:
-            if log.timestamp < context_start or log.timestamp > context_end:
-                continue
-            key = str(log.metadata.get("message_hash") or log.message)
-            if key not in patterns:
-                patterns[key] = LogPattern(key=key, count=1, sample_message=log.message)
-            else:
-                patterns[key].count += 1
-
-        pattern_list = sorted(patterns.values(), key=lambda p: p.count, reverse=True)
-        return pattern_list[: self.config.max_log_patterns]
+        context_start = start_time - self._context_delta
+        context_end = end_time + self._context_delta
+
+        lo, hi = service_logs.span(context_start, context_end)
+        keys = service_logs.keys[lo:hi]
+
+        # nlargest is stable like sorted(), so ties keep first-seen order.
+        top = heapq.nlargest(self.config.max_log_patterns, Counter(keys).items(), key=itemgetter(1))
+        # Keys and counts come straight from the Counter (count >= 1), so
+        # skip pydantic validation. The sample is the key's first message in
+        # the window, found with a C-level list.index per reported pattern.
+        messages = service_logs.messages
+        return [
+            LogPattern.model_construct(
+                key=key, count=count, sample_message=messages[lo + keys.index(key)]
+            )
+            for key, count in top
+        ]
 
     def _derive_operational_context(
         self,
         start_time: datetime,
         end_time: datetime,
-        operational_events: Optional[List[OperationalEvent]],
+        op_index: Optional[_TimeIndex],
     ) -> List[OperationalEvent]:
-        if not operational_events:
+        if op_index is None:
             return []
 
-        context_start = start_time - timedelta(seconds=self.config.context_window_seconds)
-        context_end = end_time + timedelta(seconds=self.config.context_window_seconds)
-
-        filtered = [
-            e
-            for e in operational_events
-            if context_start <= e.timestamp <= context_end
-        ]
-        filtered.sort(key=lambda e: e.timestamp)
-        return filtered[: self.config.max_operational_events]
+        context_start = start_time - self._context_delta
+        context_end = end_time + self._context_delta
 
+        return op_index.between(context_start, context_end)[: self.config.max_operational_events]
@@ -23,6 +23,7 @@ class IncidentConfig(BaseModel):
     - context_window_seconds: extra time before/after incident for context attachment.
     - max_log_patterns: cap on distinct log patterns to attach.
     - max_operational_events: cap on operational events to attach.
+    - max_workers: process count for building services in parallel; 1 builds in-process.
     """
 
     max_gap_seconds: int = Field(600, ge=0)
@@ -31,6 +32,7 @@ class IncidentConfig(BaseModel):
     context_window_seconds: int = Field(300, ge=0)
     max_log_patterns: int = Field(10, ge=1)
     max_operational_events: int = Field(10, ge=0)
+    max_workers: int = Field(1, ge=1)
 
     feature_families: Dict[str, str] = Field(
         default_factory=lambda: {
@@ -2,7 +2,8 @@
 Schema for Phase 3 incident context builder.
 
 Incident objects contain only factual, observable data derived from
-Phase 1 (logs/features) and Phase 2 (anomaly events).
+Phase 1 (logs/features) and Phase 2 (anomaly events). They are immutable once
+built; use model_copy(update=...) to derive a modified incident.
 """
 
 from __future__ import annotations
@@ -11,7 +12,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.anomaly.schema import AnomalyEvent, AnomalySeverity
 
@@ -26,6 +27,8 @@ class LogPattern(BaseModel):
     - sample_message: optional sample message (truncated upstream if needed)
     """
 
+    model_config = ConfigDict(frozen=True)
+
     key: str
     count: int = Field(ge=1)
     sample_message: Optional[str] = None
@@ -42,6 +45,8 @@ class OperationalEvent(BaseModel):
     - metadata: optional structured data
     """
 
+    model_config = ConfigDict(frozen=True)
+
     event_type: str
     timestamp: datetime
     description: str
@@ -59,6 +64,8 @@ class MetricsSummary(BaseModel):
     - severity_counts: count of anomalies by severity
     """
 
+    model_config = ConfigDict(frozen=True)
+
     anomaly_count: int = Field(ge=1)
     feature_count: int = Field(ge=1)
     max_score: float = Field(ge=0.0, le=1.0)
@@ -80,6 +87,8 @@ class Incident(BaseModel):
     - operational_context: bounded list of operational events
     """
 
+    model_config = ConfigDict(frozen=True)
+
     incident_id: str = Field(default_factory=lambda: str(uuid4()))
     service: str
     start_time: datetime
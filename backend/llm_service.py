@@ -9,16 +9,37 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 import logging
-from typing import Dict, List, Optional
+import re
+from typing import Dict, List, Optional, Tuple
 
 from backend.incident.schema import Incident
+from backend.timefmt import iso_format
+from llm.allowed import (
+    CAUSE_DEPLOYMENT,
+    CAUSE_FEATURES,
+    CAUSE_TO_STEP,
+    CAUSE_UNKNOWN,
+    FEATURE_TO_CAUSE,
+    STEP_VALIDATE_SCOPE,
+)
 from llm.config import LLMConfig
 from llm.mistral import MistralLocalModel
-from llm.prompt import build_prompt
+from llm.prompt import RESPONSE_MARKER, build_prompt
 from llm.schema import Explanation
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 logger = logging.getLogger("backend.llm")
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Body of a ```json fenced block; models often wrap the answer in one and add
+# prose (which may contain braces) after it.
+_FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
 
 @dataclass
 class IncidentExplanationService:
@@ -34,17 +55,62 @@ class IncidentExplanationService:
     model: MistralLocalModel
 
     def explain(self, incident: Incident) -> Explanation:
-        allowed_causes = self._allowed_causes(incident)
-        allowed_evidence = self._allowed_evidence(incident)
-        allowed_steps = self._allowed_steps(incident, allowed_causes)
-
-        prompt = build_prompt(incident, allowed_causes, allowed_evidence, allowed_steps)
+        allowed = self._allowed_options(incident)
+        prompt = build_prompt(incident, *allowed)
         try:
             raw = self.model.generate(prompt)
         except Exception as exc:
             logger.exception("LLM generation failed: %s", exc)
-            return self._fallback_explanation(incident, allowed_evidence)
+            return self._fallback_explanation(incident, allowed[1])
 
+        return self._explanation_from_raw(incident, raw, *allowed)
+
+    def explain_batch(self, incidents: List[Incident]) -> List[Explanation]:
+        """
+        Explain several incidents with one batched generation pass.
+
+        Models without generate_batch are called once per prompt. Results are
+        returned in input order; each one is validated independently.
+        """
+
+        if not incidents:
+            return []
+
+        options = [self._allowed_options(incident) for incident in incidents]
+        prompts = [build_prompt(incident, *allowed) for incident, allowed in zip(incidents, options)]
+
+        generate_batch = getattr(self.model, "generate_batch", None)
+        try:
+            if generate_batch is not None:
+                raws = generate_batch(prompts)
+            else:
+                raws = [self.model.generate(prompt) for prompt in prompts]
+        except Exception as exc:
+            logger.exception("LLM batch generation failed: %s", exc)
+            return [
+                self._fallback_explanation(incident, allowed[1])
+                for incident, allowed in zip(incidents, options)
+            ]
+
+        return [
+            self._explanation_from_raw(incident, raw, *allowed)
+            for incident, raw, allowed in zip(incidents, raws, options)
+        ]
+
+    def _allowed_options(self, incident: Incident) -> Tuple[List[str], List[str], List[str]]:
+        allowed_causes = self._allowed_causes(incident)
+        allowed_evidence = self._allowed_evidence(incident)
+        allowed_steps = self._allowed_steps(incident, allowed_causes)
+        return allowed_causes, allowed_evidence, allowed_steps
+
+    def _explanation_from_raw(
+        self,
+        incident: Incident,
+        raw: str,
+        allowed_causes: List[str],
+        allowed_evidence: List[str],
+        allowed_steps: List[str],
+    ) -> Explanation:
         try:
             parsed = self._parse_json(raw)
             explanation = Explanation(**parsed)
@@ -57,74 +123,61 @@ class IncidentExplanationService:
         return explanation
 
     def _allowed_causes(self, incident: Incident) -> List[str]:
-        causes = set(["unknown"])
-
-        for event in incident.anomalies:
-            for anomaly in event.anomalies:
-                feature = anomaly.feature
-                if feature in {"error_rate", "error_count"}:
-                    causes.add("error_rate_spike")
-                if feature in {"warning_rate", "warning_count"}:
-                    causes.add("warning_spike")
-                if feature in {"median_duration_ms", "p95_duration_ms", "max_duration_ms"}:
-                    causes.add("latency_regression")
-                if feature in {"total_events", "info_count"}:
-                    causes.add("traffic_spike")
-                if feature in {"unique_messages", "unique_error_codes"}:
-                    causes.add("error_variation")
+        features = {anomaly.feature for event in incident.anomalies for anomaly in event.anomalies}
+        causes = {CAUSE_UNKNOWN}
+        causes.update(FEATURE_TO_CAUSE[feature] for feature in features & CAUSE_FEATURES)
 
         for op in incident.operational_context:
             if "deploy" in op.event_type.lower():
-                causes.add("deployment_change")
+                causes.add(CAUSE_DEPLOYMENT)
 
         return sorted(causes)
 
     def _allowed_evidence(self, incident: Incident) -> List[str]:
-        evidence = set()
-        evidence.add(f"service={incident.service}")
-        evidence.add(f"start_time={incident.start_time.isoformat()}")
-        evidence.add(f"end_time={incident.end_time.isoformat()}")
-        evidence.add(f"max_score={incident.metrics_summary.max_score:.2f}")
+        evidence: List[str] = [
+            f"service={incident.service}",
+            f"start_time={iso_format(incident.start_time)}",
+            f"end_time={iso_format(incident.end_time)}",
+            f"max_score={incident.metrics_summary.max_score:.2f}",
+        ]
 
         for event in incident.anomalies:
-            evidence.add(f"window_start={event.window_start.isoformat()}")
-            evidence.add(f"severity={event.severity}")
+            evidence.append(f"window_start={iso_format(event.window_start)}")
+            evidence.append(f"severity={event.severity}")
             for anomaly in event.anomalies:
-                evidence.add(f"feature={anomaly.feature}")
-                evidence.add(f"direction={anomaly.direction}")
+                evidence.append(f"feature={anomaly.feature}")
+                evidence.append(f"direction={anomaly.direction}")
 
-        for pattern in incident.log_patterns:
-            evidence.add(f"log_pattern={pattern.key}|count={pattern.count}")
-
-        for op in incident.operational_context:
-            evidence.add(f"op_event={op.event_type}|time={op.timestamp.isoformat()}")
+        evidence.extend(
+            f"log_pattern={pattern.key}|count={pattern.count}" for pattern in incident.log_patterns
+        )
+        evidence.extend(
+            f"op_event={op.event_type}|time={iso_format(op.timestamp)}"
+            for op in incident.operational_context
+        )
 
-        return sorted(evidence)
+        # Incident fields are already ordered upstream; dedupe keeping that order.
+        return list(dict.fromkeys(evidence))
 
     def _allowed_steps(self, incident: Incident, causes: List[str]) -> List[str]:
-        steps = set()
-
-        if "deployment_change" in causes:
-            steps.add("Review recent deployments in the incident window")
-        if "error_rate_spike" in causes or "warning_spike" in causes:
-            steps.add("Inspect error and warning logs for the affected service")
-        if "latency_regression" in causes:
-            steps.add("Check latency metrics and downstream dependencies")
-        if "traffic_spike" in causes:
-            steps.add("Verify traffic sources and request patterns")
-        if "error_variation" in causes:
-            steps.add("Group errors by code to identify new patterns")
-
-        steps.add("Validate incident scope and confirm if impact persists")
+        steps = {CAUSE_TO_STEP[cause] for cause in causes if cause in CAUSE_TO_STEP}
+        steps.add(STEP_VALIDATE_SCOPE)
         return sorted(steps)
 
     def _parse_json(self, raw: str) -> Dict[str, object]:
-        start = raw.find("{")
-        end = raw.rfind("}")
+        # The decoded output echoes the prompt, whose INSTRUCTIONS line is JSON
+        # as well; only scan the text after the response marker.
+        _, marker, answer = raw.rpartition(RESPONSE_MARKER)
+        if not marker:
+            answer = raw
+        fenced = _FENCED_JSON_RE.search(answer)
+        if fenced is not None:
+            return _json_loads(fenced.group(1))
+        start = answer.find("{")
+        end = answer.rfind("}")
         if start == -1 or end == -1 or end <= start:
             raise ValueError("No JSON object found in LLM output")
-        payload = raw[start : end + 1]
-        return json.loads(payload)
+        return _json_loads(answer[start : end + 1])
 
     def _validate_allowed(
         self,
@@ -133,23 +186,26 @@ class IncidentExplanationService:
         allowed_evidence: List[str],
         allowed_steps: List[str],
     ) -> bool:
-        if not set(explanation.probable_causes).issubset(set(allowed_causes)):
-            return False
-        if not set(explanation.supporting_evidence).issubset(set(allowed_evidence)):
+        # Each allowed set is built only once the previous check has passed, and
+        # all() stops at the first item the model was not allowed to use.
+        cause_set = frozenset(allowed_causes)
+        if not all(cause in cause_set for cause in explanation.probable_causes):
             return False
-        if not set(explanation.recommended_next_steps).issubset(set(allowed_steps)):
+        evidence_set = frozenset(allowed_evidence)
+        if not all(item in evidence_set for item in explanation.supporting_evidence):
             return False
-        return True
+        step_set = frozenset(allowed_steps)
+        return all(step in step_set for step in explanation.recommended_next_steps)
 
     def _fallback_explanation(self, incident: Incident, allowed_evidence: List[str]) -> Explanation:
         evidence = allowed_evidence[:3] if allowed_evidence else [f"service={incident.service}"]
         return Explanation(
             incident_id=incident.incident_id,
             summary="Incident explanation unavailable; fallback generated from known facts.",
-            probable_causes=["unknown"],
+            probable_causes=[CAUSE_UNKNOWN],
             supporting_evidence=evidence,
             confidence_score=0.1,
-            recommended_next_steps=["Validate incident scope and confirm if impact persists"],
+            recommended_next_steps=[STEP_VALIDATE_SCOPE],
             limitations="LLM output was invalid or unavailable; returned minimal factual summary.",
         )
 
@@ -10,29 +10,100 @@ import argparse
 import json
 import logging
 import os
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
 from backend.incident import IncidentBuilder
+from backend.timefmt import iso_format
 from typing import TYPE_CHECKING
-from src.anomaly import AnomalyEngine, AnomalySeverity, overall_severity
-from src.core.config import config
+from src.anomaly import AnomalyEngine, AnomalyEvent, AnomalySeverity, overall_severity
+from src.core.config import ensure_logs_dir
 from src.data import aggregate_logs, extract_features_from_windows, ingest_logs, normalize_logs, parse_logs
 from src.data.schema import FeatureVector, LogEntry
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 load_dotenv()
 
 logger = logging.getLogger("backend")
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
-UPLOADS: Dict[str, Dict[str, object]] = {}
+
+class UploadStore:
+    """
+    Least-recently-used store of per-upload state.
+
+    Each entry holds an upload's features, logs and incidents, so the store is
+    capped at max_entries and the oldest upload is evicted first. Handler
+    threads share it, so access goes through a lock.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, file_id: object) -> bool:
+        with self._lock:
+            return file_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __getitem__(self, file_id: str) -> Dict[str, object]:
+        with self._lock:
+            entry = self._entries[file_id]
+            self._entries.move_to_end(file_id)
+            return entry
+
+    def get(self, file_id: object) -> Optional[Dict[str, object]]:
+        """
+        Entry for file_id, or None if it was never stored or was evicted.
+
+        Handlers fetch an entry once and keep using it, since a separate
+        membership check and lookup could straddle an eviction.
+        """
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is not None:
+                self._entries.move_to_end(file_id)
+            return entry
+
+    def __setitem__(self, file_id: str, entry: Dict[str, object]) -> None:
+        with self._lock:
+            self._entries[file_id] = entry
+            self._entries.move_to_end(file_id)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.info("Evicted upload %s from memory", evicted)
+
+
+UPLOADS = UploadStore(max_entries=int(os.getenv("UPLOADS_MAX_ENTRIES", "32")))
+UPLOAD_CHUNK_SIZE = 1 << 20
 ACTIVE_FILE_ID: Optional[str] = None
 EXPLANATION_SERVICE = None
+_EXPLANATION_SERVICE_LOCK = threading.Lock()
+_ANOMALY_ENGINE: Optional[AnomalyEngine] = None
+
+# orjson (perf extra) encodes large detect payloads several times faster.
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps(payload: Dict[str, object]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
 
 
 def _parse_bool(value: str | None, default: bool) -> bool:
@@ -79,35 +150,137 @@ def _parse_content_disposition(value: str) -> Dict[str, str]:
     return params
 
 
-def _parse_multipart(body: bytes, boundary: bytes) -> Dict[str, Tuple[Dict[str, str], bytes]]:
-    fields: Dict[str, Tuple[Dict[str, str], bytes]] = {}
-    delimiter = b"--" + boundary
-    for part in body.split(delimiter):
-        part = part.strip()
-        if not part or part == b"--":
-            continue
-        if part.startswith(b"--"):
-            continue
-        header_blob, _, content = part.partition(b"\r\n\r\n")
-        if not content:
+def _parse_part_headers(blob: bytes) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in blob.decode("utf-8", errors="ignore").split("\r\n"):
+        if ":" not in line:
             continue
-        header_lines = header_blob.decode("utf-8", errors="ignore").split("\r\n")
-        headers: Dict[str, str] = {}
-        for line in header_lines:
-            if ":" not in line:
-                continue
-            key, value = line.split(":", 1)
-            headers[key.strip().lower()] = value.strip()
-        content = content.rsplit(b"\r\n", 1)[0]
-        disposition = headers.get("content-disposition", "")
-        params = _parse_content_disposition(disposition)
-        name = params.get("name")
-        if name:
-            fields[name] = (params, content)
-    return fields
+        key, value = line.split(":", 1)
+        headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+def _read_chunks(stream: BinaryIO, length: int) -> Iterator[bytes]:
+    remaining = length
+    while remaining > 0:
+        chunk = stream.read(min(UPLOAD_CHUNK_SIZE, remaining))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _write_prefix(out: BinaryIO, buffer: bytearray, end: int) -> None:
+    # Write through a memoryview so the bytes are not copied first; the view
+    # is released before the caller resizes the buffer.
+    with memoryview(buffer) as view:
+        out.write(view[:end])
+
+
+def _stream_multipart_file(
+    stream: BinaryIO,
+    length: int,
+    boundary: bytes,
+    field: str,
+    target_for: Callable[[str], Path],
+) -> Optional[Tuple[str, Path]]:
+    """
+    Stream one file field of a multipart body straight to disk.
+
+    Reads the body in UPLOAD_CHUNK_SIZE chunks and only buffers part headers
+    plus a boundary-sized tail, so memory stays flat regardless of upload size.
+    target_for maps the client filename to the save path. Returns
+    (filename, path) once the field's closing boundary is seen, else None.
+    """
+
+    # Prefixing CRLF makes the opening boundary match like every later one.
+    delimiter = b"\r\n--" + boundary
+    keep = len(delimiter) - 1
+    # A bytearray is consumed in place (del from the front is O(1) amortized),
+    # so no step materializes a fresh copy of the remaining buffer.
+    buffer = bytearray(b"\r\n")
+    header_scan = 0  # where the next search for the header terminator resumes
+    state = "body"  # the preamble is skipped as the body of no field
+    out: Optional[BinaryIO] = None
+    pending: Optional[Tuple[str, Path]] = None
+    result: Optional[Tuple[str, Path]] = None
+
+    try:
+        for chunk in _read_chunks(stream, length):
+            buffer += chunk
+            while True:
+                if state == "body":
+                    idx = buffer.find(delimiter)
+                    if idx == -1:
+                        if len(buffer) > keep:
+                            if out is not None:
+                                _write_prefix(out, buffer, len(buffer) - keep)
+                            del buffer[:-keep]
+                        break
+                    if out is not None:
+                        _write_prefix(out, buffer, idx)
+                        out.close()
+                        out, result, pending = None, pending, None
+                    del buffer[: idx + len(delimiter)]
+                    state = "boundary"
+
+                if state == "boundary":
+                    if len(buffer) < 2:
+                        break
+                    if buffer.startswith(b"--"):
+                        state = "done"
+                        break
+                    state = "headers"
+
+                if state == "headers":
+                    end = buffer.find(b"\r\n\r\n", header_scan)
+                    if end == -1:
+                        header_scan = max(0, len(buffer) - 3)
+                        break
+                    headers = _parse_part_headers(bytes(buffer[:end]))
+                    del buffer[: end + 4]
+                    header_scan = 0
+                    params = _parse_content_disposition(headers.get("content-disposition", ""))
+                    if params.get("name") == field and result is None:
+                        filename = params.get("filename", "upload.log")
+                        path = target_for(filename)
+                        out = path.open("wb")
+                        pending = (filename, path)
+                    state = "body"
+
+                if state == "done":
+                    buffer.clear()  # discard the epilogue while draining the body
+                    break
+    finally:
+        if out is not None:
+            out.close()
+        if pending is not None:
+            # Body ended before the field's closing boundary.
+            pending[1].unlink(missing_ok=True)
+
+    return result
+
+
+def _detect_events(features: List[FeatureVector]) -> List[AnomalyEvent]:
+    # The template engine only holds stateless detectors and scoring; each
+    # detect gets its own baselines, so concurrent requests never contend.
+    # A racing first call may build a spare template, which is harmless.
+    global _ANOMALY_ENGINE
+    if _ANOMALY_ENGINE is None:
+        _ANOMALY_ENGINE = AnomalyEngine()
+    return _ANOMALY_ENGINE.fresh().detect_batch(features)
 
 
 def _explanation_service() -> Optional[object]:
+    if EXPLANATION_SERVICE is not None:
+        return EXPLANATION_SERVICE
+    # Handler threads may race here on the first explain; only one service
+    # (and so one copy of the model weights) may be created per process.
+    with _EXPLANATION_SERVICE_LOCK:
+        return _create_explanation_service()
+
+
+def _create_explanation_service() -> Optional[object]:
     global EXPLANATION_SERVICE
     if EXPLANATION_SERVICE is not None:
         return EXPLANATION_SERVICE
@@ -132,12 +305,6 @@ def _explanation_service() -> Optional[object]:
     return EXPLANATION_SERVICE
 
 
-def _map_severity(severity: AnomalySeverity) -> Optional[str]:
-    if severity == AnomalySeverity.NONE:
-        return None
-    return severity.value
-
-
 def _incident_description(service: str, anomaly_count: int) -> str:
     return f"{service} incident with {anomaly_count} anomaly windows detected."
 
@@ -155,10 +322,21 @@ def _explanation_to_frontend(explanation: "Explanation", service: str) -> Dict[s
 
 class BackendHandler(BaseHTTPRequestHandler):
     server_version = "DerivBackend/1.0"
+    # Keep-alive lets the frontend reuse one connection (and one handler
+    # thread) across its polling requests; every response sets Content-Length.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY, Nagle
+    # plus delayed ACK stalls each keep-alive response by ~40 ms.
+    disable_nagle_algorithm = True
 
     def _send_json(self, status: int, payload: Dict[str, object]) -> None:
-        body = json.dumps(payload).encode("utf-8")
+        body = _dumps(payload)
         self.send_response(status)
+        if status >= 400:
+            # Error paths may not have consumed the request body; drop the
+            # connection rather than parse leftover bytes as the next request.
+            self.send_header("Connection", "close")
+            self.close_connection = True
         self.send_header("Content-Type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
@@ -173,8 +351,8 @@ class BackendHandler(BaseHTTPRequestHandler):
             return None
         data = self.rfile.read(length)
         try:
-            return json.loads(data.decode("utf-8"))
-        except json.JSONDecodeError:
+            return _loads(data)
+        except ValueError:  # json and orjson decode errors, bad UTF-8
             return None
 
     def do_GET(self) -> None:
@@ -183,12 +361,12 @@ class BackendHandler(BaseHTTPRequestHandler):
             return
 
         if self.path == "/incidents":
-            global ACTIVE_FILE_ID
-            if not ACTIVE_FILE_ID or ACTIVE_FILE_ID not in UPLOADS:
+            entry = UPLOADS.get(ACTIVE_FILE_ID) if ACTIVE_FILE_ID else None
+            if entry is None:
                 self._send_json(200, {"incidents": [], "total_count": 0})
                 return
 
-            incidents = UPLOADS[ACTIVE_FILE_ID].get("incidents", [])
+            incidents = entry.get("incidents", [])
             self._send_json(
                 200,
                 {
@@ -205,6 +383,7 @@ class BackendHandler(BaseHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
     def do_POST(self) -> None:
@@ -216,6 +395,10 @@ class BackendHandler(BaseHTTPRequestHandler):
             self._handle_detect()
             return
 
+        if self.path == "/incidents/explain_batch":
+            self._handle_explain_batch()
+            return
+
         if self.path.startswith("/incidents/") and self.path.endswith("/explain"):
             self._handle_explain()
             return
@@ -237,36 +420,40 @@ class BackendHandler(BaseHTTPRequestHandler):
         for part in content_type.split(";"):
             part = part.strip()
             if part.startswith("boundary="):
-                boundary_token = part.split("=", 1)[1]
+                boundary_token = part.split("=", 1)[1].strip('"')
                 break
 
         if not boundary_token:
             self._send_json(400, {"detail": "Missing multipart boundary"})
             return
 
-        body = self.rfile.read(length)
-        fields = _parse_multipart(body, boundary_token.encode("utf-8"))
-        if "file" not in fields:
+        file_id = str(uuid.uuid4())
+
+        def _save_path(filename: str) -> Path:
+            suffix = Path(filename).suffix or ".log"
+            return ensure_logs_dir() / f"{file_id}{suffix}"
+
+        upload = _stream_multipart_file(
+            self.rfile, length, boundary_token.encode("utf-8"), "file", _save_path
+        )
+        if upload is None:
             self._send_json(400, {"detail": "Missing file field"})
             return
 
-        file_meta, data = fields["file"]
-        filename = file_meta.get("filename", "upload.log")
-
-        file_id = str(uuid.uuid4())
-        suffix = Path(filename).suffix or ".log"
-        save_path = config.logs_dir / f"{file_id}{suffix}"
-        save_path.write_bytes(data)
+        _, save_path = upload
 
         features, normalized_logs, parsed_logs = _features_from_file(save_path)
 
-        columns = sorted({key for item in parsed_logs for key in item.keys()}) if parsed_logs else []
+        # set.union walks each dict's keys in C rather than a nested comprehension.
+        columns = sorted(set().union(*parsed_logs))
 
+        # Only what detection needs is kept: parsed_logs (one dict per row) is
+        # dropped after reporting its shape, and logs are grouped once here
+        # rather than on every detect call.
         UPLOADS[file_id] = {
             "path": str(save_path),
             "features": features,
-            "normalized_logs": normalized_logs,
-            "parsed_logs": parsed_logs,
+            "logs_by_service": _group_logs_by_service(normalized_logs),
             "incidents": [],
             "anomalies": [],
         }
@@ -284,48 +471,49 @@ class BackendHandler(BaseHTTPRequestHandler):
     def _handle_detect(self) -> None:
         payload = self._read_json() or {}
         file_id = payload.get("file_id")
-        if not file_id or file_id not in UPLOADS:
+        entry = UPLOADS.get(file_id) if isinstance(file_id, str) and file_id else None
+        if entry is None:
             self._send_json(404, {"detail": "Unknown file_id"})
             return
 
         start = datetime.now(timezone.utc)
-        engine = AnomalyEngine()
-        features = UPLOADS[file_id]["features"]
-        events = engine.detect(features)
+        events = _detect_events(entry["features"])
 
-        anomalies = []
+        anomalies: List[Dict[str, object]] = []
+        none = AnomalySeverity.NONE
         for event in events:
-            for anomaly in event.anomalies:
-                severity = _map_severity(anomaly.severity)
-                if not severity:
-                    continue
-                anomalies.append(
-                    {
-                        "id": f"{event.event_id}:{anomaly.feature}",
-                        "timestamp": event.window_start.isoformat(),
-                        "service": event.service,
-                        "feature": anomaly.feature,
-                        "observed_value": anomaly.observed,
-                        "baseline_value": anomaly.baseline_mean,
-                        "severity": severity,
-                        "deviation": anomaly.z_score or anomaly.rate_change or 0.0,
-                    }
-                )
-
-        logs_by_service = _group_logs_by_service(UPLOADS[file_id]["normalized_logs"])
+            # Per-event fields are resolved once, not once per anomaly.
+            timestamp = iso_format(event.window_start)
+            service = event.service
+            event_id = event.event_id
+            anomalies.extend(
+                {
+                    "id": f"{event_id}:{anomaly.feature}",
+                    "timestamp": timestamp,
+                    "service": service,
+                    "feature": anomaly.feature,
+                    "observed_value": anomaly.observed,
+                    "baseline_value": anomaly.baseline_mean,
+                    "severity": anomaly.severity.value,
+                    "deviation": anomaly.z_score or anomaly.rate_change or 0.0,
+                }
+                for anomaly in event.anomalies
+                if anomaly.severity is not none
+            )
+
+        logs_by_service = entry["logs_by_service"]
         builder = IncidentBuilder()
         incidents_raw = builder.build_incidents(events, logs_by_service)
 
         incidents = []
         for incident in incidents_raw:
-            event_severities = [e.severity for e in incident.anomalies]
-            severity = overall_severity(*event_severities).value
+            severity = overall_severity(*(e.severity for e in incident.anomalies)).value
             incidents.append(
                 {
                     "id": incident.incident_id,
                     "service": incident.service,
-                    "start_time": incident.start_time.isoformat(),
-                    "end_time": incident.end_time.isoformat(),
+                    "start_time": iso_format(incident.start_time),
+                    "end_time": iso_format(incident.end_time),
                     "severity": severity,
                     "anomaly_count": incident.metrics_summary.anomaly_count,
                     "description": _incident_description(incident.service, incident.metrics_summary.anomaly_count),
@@ -333,9 +521,10 @@ class BackendHandler(BaseHTTPRequestHandler):
                 }
             )
 
-        UPLOADS[file_id]["anomalies"] = anomalies
-        UPLOADS[file_id]["incidents_raw"] = incidents_raw
-        UPLOADS[file_id]["incidents"] = incidents
+        entry["anomalies"] = anomalies
+        entry["incidents_raw"] = incidents_raw
+        entry["incidents_by_id"] = {i.incident_id: i for i in incidents_raw}
+        entry["incidents"] = incidents
 
         global ACTIVE_FILE_ID
         ACTIVE_FILE_ID = file_id
@@ -362,12 +551,13 @@ class BackendHandler(BaseHTTPRequestHandler):
             return
 
         incident_id = parts[1]
-        if not ACTIVE_FILE_ID or ACTIVE_FILE_ID not in UPLOADS:
+        entry = UPLOADS.get(ACTIVE_FILE_ID) if ACTIVE_FILE_ID else None
+        if entry is None:
             self._send_json(404, {"detail": "No incidents available"})
             return
 
-        incidents_raw = UPLOADS[ACTIVE_FILE_ID].get("incidents_raw", [])
-        incident = next((i for i in incidents_raw if i.incident_id == incident_id), None)
+        incidents_by_id = entry.get("incidents_by_id", {})
+        incident = incidents_by_id.get(incident_id)
         if incident is None:
             self._send_json(404, {"detail": "Incident not found"})
             return
@@ -380,6 +570,49 @@ class BackendHandler(BaseHTTPRequestHandler):
         explanation = service.explain(incident)
         self._send_json(200, _explanation_to_frontend(explanation, incident.service))
 
+    def _handle_explain_batch(self) -> None:
+        payload = self._read_json()
+        incident_ids = payload.get("incident_ids") if isinstance(payload, dict) else None
+        if (
+            not isinstance(incident_ids, list)
+            or not incident_ids
+            or not all(isinstance(i, str) for i in incident_ids)
+        ):
+            self._send_json(400, {"detail": "Expected non-empty incident_ids list of strings"})
+            return
+        # Each incident is explained once, in first-requested order.
+        incident_ids = list(dict.fromkeys(incident_ids))
+
+        entry = UPLOADS.get(ACTIVE_FILE_ID) if ACTIVE_FILE_ID else None
+        if entry is None:
+            self._send_json(404, {"detail": "No incidents available"})
+            return
+
+        incidents_by_id = entry.get("incidents_by_id", {})
+        incidents = [incidents_by_id[i] for i in incident_ids if i in incidents_by_id]
+        not_found = [i for i in incident_ids if i not in incidents_by_id]
+        if not incidents:
+            self._send_json(404, {"detail": "Incident not found", "not_found": not_found})
+            return
+
+        service = _explanation_service()
+        if service is None:
+            self._send_json(500, {"detail": "MODEL_PATH not configured"})
+            return
+
+        # One batched generate call amortizes weight reads across incidents.
+        explanations = service.explain_batch(incidents)
+        self._send_json(
+            200,
+            {
+                "explanations": [
+                    _explanation_to_frontend(explanation, incident.service)
+                    for explanation, incident in zip(explanations, incidents)
+                ],
+                "not_found": not_found,
+            },
+        )
+
 
 def run(host: str, port: int) -> None:
     logger.info("Starting backend server on %s:%s", host, port)
@@ -388,6 +621,8 @@ def run(host: str, port: int) -> None:
     if _model_path():
         _explanation_service()
     server = ThreadingHTTPServer((host, port), BackendHandler)
+    # Handler threads must not keep the process alive on shutdown.
+    server.daemon_threads = True
     server.serve_forever()
 
 
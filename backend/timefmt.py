@@ -0,0 +1,25 @@
+"""
+Timestamp formatting shared by the HTTP layer, the LLM service and the LoRA
+training allow-lists.
+
+Incident, window and event timestamps recur heavily (every service shares the
+same aggregation windows), so isoformat() results are memoized.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+
+def iso_format(dt: datetime) -> str:
+    """Cached dt.isoformat()."""
+    # Aware datetimes for the same instant compare equal across offsets, so the
+    # offset is part of the cache key.
+    return _iso_cached(dt, dt.utcoffset())
+
+
+@lru_cache(maxsize=8192)
+def _iso_cached(dt: datetime, offset: Optional[timedelta]) -> str:
+    return dt.isoformat()
@@ -0,0 +1,55 @@
+"""
+Allowed-choice vocabulary for incident explanations.
+
+Training prompts and inference prompts must offer the model exactly the same
+causes and next steps, so both build their allowed lists from these tables.
+"""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+
+CAUSE_UNKNOWN = "unknown"
+CAUSE_ERROR_RATE = "error_rate_spike"
+CAUSE_WARNING = "warning_spike"
+CAUSE_LATENCY = "latency_regression"
+CAUSE_TRAFFIC = "traffic_spike"
+CAUSE_ERROR_VARIATION = "error_variation"
+CAUSE_DEPLOYMENT = "deployment_change"
+
+STEP_REVIEW_DEPLOYMENTS = "Review recent deployments in the incident window"
+STEP_INSPECT_LOGS = "Inspect error and warning logs for the affected service"
+STEP_CHECK_LATENCY = "Check latency metrics and downstream dependencies"
+STEP_VERIFY_TRAFFIC = "Verify traffic sources and request patterns"
+STEP_GROUP_ERRORS = "Group errors by code to identify new patterns"
+STEP_VALIDATE_SCOPE = "Validate incident scope and confirm if impact persists"
+
+# Feature -> probable cause, resolved once at import instead of per anomaly.
+FEATURE_TO_CAUSE = MappingProxyType(
+    {
+        "error_rate": CAUSE_ERROR_RATE,
+        "error_count": CAUSE_ERROR_RATE,
+        "warning_rate": CAUSE_WARNING,
+        "warning_count": CAUSE_WARNING,
+        "median_duration_ms": CAUSE_LATENCY,
+        "p95_duration_ms": CAUSE_LATENCY,
+        "max_duration_ms": CAUSE_LATENCY,
+        "total_events": CAUSE_TRAFFIC,
+        "info_count": CAUSE_TRAFFIC,
+        "unique_messages": CAUSE_ERROR_VARIATION,
+        "unique_error_codes": CAUSE_ERROR_VARIATION,
+    }
+)
+CAUSE_FEATURES = frozenset(FEATURE_TO_CAUSE)
+
+# Cause -> recommended next step.
+CAUSE_TO_STEP = MappingProxyType(
+    {
+        CAUSE_DEPLOYMENT: STEP_REVIEW_DEPLOYMENTS,
+        CAUSE_ERROR_RATE: STEP_INSPECT_LOGS,
+        CAUSE_WARNING: STEP_INSPECT_LOGS,
+        CAUSE_LATENCY: STEP_CHECK_LATENCY,
+        CAUSE_TRAFFIC: STEP_VERIFY_TRAFFIC,
+        CAUSE_ERROR_VARIATION: STEP_GROUP_ERRORS,
+    }
+)
@@ -9,6 +9,7 @@ from __future__ import annotations
 import os
 
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -21,6 +22,14 @@ class LLMConfig(BaseModel):
     - model_path must point to a local directory (no remote fetch).
     - temperature is 0.0 to reduce variability.
     - do_sample is disabled for deterministic output shape.
+    - max_batch_size caps prompts per batched generate() call (KV cache budget).
+    - quantization selects bitsandbytes weight quantization on CUDA (nf4 or int8);
+      ignored on CPU, None loads full-precision weights.
+    - prefix_cache reuses the KV cache of the shared prompt prefix across generate() calls.
+    - compile wraps the forward pass in torch.compile on CUDA and pads prompts to
+      power-of-two lengths so captured graphs are reused; off by default because
+      the first calls per length pay the compilation cost.
+    - stop_at_json_end ends generation once the answer's JSON object is closed.
     """
 
     model_path: str = Field(..., description="Local filesystem path to Mistral model")
@@ -28,6 +37,11 @@ class LLMConfig(BaseModel):
     temperature: float = Field(0.0, ge=0.0, le=1.0)
     top_p: float = Field(0.9, ge=0.0, le=1.0)
     repetition_penalty: float = Field(1.05, ge=1.0, le=2.0)
+    max_batch_size: int = Field(8, ge=1, le=64)
+    quantization: Optional[Literal["nf4", "int8"]] = "nf4"
+    prefix_cache: bool = True
+    compile: bool = False
+    stop_at_json_end: bool = True
     local_files_only: bool = False
 
     def model_post_init(self, __context: object) -> None:
@@ -1,4 +1,3 @@
-import copy
 import json
 import os
 import traceback
@@ -124,29 +123,38 @@ def _load_base_model() -> tuple[AutoTokenizer, AutoModelForCausalLM]:
     return tokenizer, model
 
 
+def _load_lora_model(base_model: AutoModelForCausalLM) -> PeftModel:
+    # Attach the adapter once; base runs disable it instead of reloading.
+    model = PeftModel.from_pretrained(
+        base_model,
+        LORA_PATH,
+        adapter_name="lora",
+        is_trainable=False,
+        local_files_only=True,
+    )
+    model.eval()
+    return model
+
+
 def run_inference_with_model(
     use_lora: bool,
     incident: Incident,
     tokenizer: AutoTokenizer,
-    base_model: AutoModelForCausalLM,
+    model: PeftModel,
 ) -> dict:
     llm_config.USE_LORA = use_lora
     llm_mistral.USE_LORA = use_lora
     config = LLMConfig(model_path=str(model_path), max_new_tokens=64)
 
-    model = base_model
-    if use_lora:
-        model = PeftModel.from_pretrained(
-            base_model,
-            LORA_PATH,
-            is_trainable=False,
-            local_files_only=True,
-        )
-        model.eval()
-
     wrapper = _HFModelWrapper(tokenizer, model, config)
     service = IncidentExplanationService(model=wrapper)
-    explanation = service.explain(copy.deepcopy(incident))
+    # Incident is a frozen model and explain() only reads it; no copy needed.
+    if use_lora:
+        model.set_adapter("lora")
+        explanation = service.explain(incident)
+    else:
+        with model.disable_adapter():
+            explanation = service.explain(incident)
     return explanation.model_dump()
 
 
@@ -158,7 +166,8 @@ def main() -> None:
 
     try:
         tokenizer, base_model = _load_base_model()
-        base_output = run_inference_with_model(False, incident, tokenizer, base_model)
+        model = _load_lora_model(base_model)
+        base_output = run_inference_with_model(False, incident, tokenizer, model)
         base_text = "\n".join(
             [
                 "=== BASE ===",
@@ -169,7 +178,7 @@ def main() -> None:
         print(base_text)
         evidence_path.write_text(base_text, encoding="utf-8")
 
-        lora_output = run_inference_with_model(True, incident, tokenizer, base_model)
+        lora_output = run_inference_with_model(True, incident, tokenizer, model)
         lora_text = "\n".join(
             [
                 "=== LORA ===",
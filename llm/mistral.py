@@ -6,18 +6,107 @@ Offline-only: uses local_files_only=True by default.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import copy
+from dataclasses import dataclass, field
 import logging
-from typing import Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
 from peft import PeftModel
 
 from .config import LLMConfig, LORA_PATH, USE_LORA
+from .prompt import PROMPT_PREFIX
 
 logger = logging.getLogger("llm")
 
 
+class _JsonEndScanner:
+    """
+    Incremental brace/string tracker for one stream of generated text.
+
+    feed() takes only the text generated since the previous call, so each
+    character is scanned once however long the output grows.
+    """
+
+    __slots__ = ("depth", "in_string", "escaped", "closed")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.closed = False
+
+    def feed(self, text: str) -> bool:
+        """Scan more text; True once a complete top-level JSON object was seen."""
+        if self.closed:
+            return True
+        depth, in_string, escaped = self.depth, self.in_string, self.escaped
+        for char in text:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}" and depth:
+                depth -= 1
+                if depth == 0:
+                    self.closed = True
+                    return True
+        self.depth, self.in_string, self.escaped = depth, in_string, escaped
+        return False
+
+
+def _json_object_closed(text: str) -> bool:
+    """Return True once text contains a complete top-level JSON object."""
+    return _JsonEndScanner().feed(text)
+
+
+class _StopAtJsonEnd(StoppingCriteria):
+    """
+    Stop each row as soon as its generated text closes a JSON object.
+
+    The answer is a single JSON object, so anything generated after its
+    closing brace is discarded by the parser anyway. Each row keeps a scanner
+    and the number of generated tokens already fed to it, so every step only
+    decodes the tokens added since the last one.
+    """
+
+    def __init__(self, tokenizer: AutoTokenizer, prompt_length: int) -> None:
+        self._tokenizer = tokenizer
+        self._prompt_length = prompt_length
+        self._scanners: List[_JsonEndScanner] = []
+        self._offsets: List[int] = []
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        if not self._scanners:
+            self._scanners = [_JsonEndScanner() for _ in range(input_ids.shape[0])]
+            self._offsets = [self._prompt_length] * input_ids.shape[0]
+
+        length = input_ids.shape[1]
+        done = []
+        for row, scanner in enumerate(self._scanners):
+            if not scanner.closed and self._offsets[row] < length:
+                text = self._tokenizer.decode(
+                    input_ids[row, self._offsets[row] :], skip_special_tokens=True
+                )
+                # A trailing U+FFFD is a multi-byte character split across
+                # tokens; leave those tokens for the next step to complete.
+                if not text.endswith("\ufffd"):
+                    scanner.feed(text)
+                    self._offsets[row] = length
+            done.append(scanner.closed)
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
 @dataclass
 class MistralLocalModel:
     """
@@ -29,10 +118,20 @@ class MistralLocalModel:
     config: LLMConfig
     _tokenizer: Optional[AutoTokenizer] = None
     _model: Optional[AutoModelForCausalLM] = None
+    # (prefix input_ids, past_key_values) for PROMPT_PREFIX, computed lazily.
+    _prefix_cache: Optional[Tuple[object, object]] = None
+    _compiled: bool = False
+    _load_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
     def load(self) -> None:
         if self._model is not None and self._tokenizer is not None:
             return
+        # Concurrent first requests must not each load a copy of the weights.
+        with self._load_lock:
+            if self._model is None or self._tokenizer is None:
+                self._load()
+
+    def _load(self) -> None:
         try:
             import torch
             device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -40,57 +139,212 @@ class MistralLocalModel:
             device = "cpu"
 
         logger.info("Loading base model from %s (local_files_only=%s, device=%s)", self.config.model_path, self.config.local_files_only, device)
-        self._tokenizer = AutoTokenizer.from_pretrained(
+        tokenizer = AutoTokenizer.from_pretrained(
             self.config.model_path, local_files_only=self.config.local_files_only
         )
-        self._model = AutoModelForCausalLM.from_pretrained(
-            self.config.model_path, local_files_only=self.config.local_files_only
+        # Mistral ships without a pad token. Padding with EOS on the left keeps
+        # every row's generated tokens aligned for batching and bucketing, and
+        # the attention mask lets the kernels skip the pads.
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+        model = AutoModelForCausalLM.from_pretrained(
+            self.config.model_path,
+            local_files_only=self.config.local_files_only,
+            **self._device_kwargs(device),
         )
         logger.info("Base model loaded successfully")
         if USE_LORA:
             logger.info("Attaching LoRA adapter from %s", LORA_PATH)
-            self._model = PeftModel.from_pretrained(
-                self._model,
+            model = PeftModel.from_pretrained(
+                model,
                 LORA_PATH,
                 is_trainable=False,
                 local_files_only=self.config.local_files_only,
             )
             logger.info("LoRA adapter attached")
-        self._model.eval()
+        model.eval()
 
-    def generate(self, prompt: str) -> str:
-        if self._model is None or self._tokenizer is None:
-            self.load()
+        if self.config.compile and device == "cuda":
+            import torch
 
-        max_positions = getattr(self._model.config, "n_positions", None) or getattr(
-            self._model.config, "max_position_embeddings", None
-        )
-        model_max_length = self._tokenizer.model_max_length
-        if max_positions:
-            max_length = min(model_max_length, max_positions)
+            # generate() drives decoding and calls forward once per token, so
+            # forward is where per-step dispatch overhead lives. LoRA layers sit
+            # inside the base model, so compiling its forward covers them too.
+            base = model.get_base_model() if isinstance(model, PeftModel) else model
+            base.forward = torch.compile(base.forward, mode="reduce-overhead")
+            self._compiled = True
+            logger.info("Compiled model forward with torch.compile (reduce-overhead)")
+
+        # Publish only the fully prepared model; load() checks these unlocked.
+        self._tokenizer = tokenizer
+        self._model = model
+
+    def _device_kwargs(self, device: str) -> Dict[str, object]:
+        """
+        from_pretrained kwargs placing weights on the GPU when one is available.
+
+        On CUDA, weights are quantized with bitsandbytes per config.quantization
+        (4-bit NF4 by default), falling back to FP16 if bitsandbytes is missing.
+        On CPU the model loads in its default dtype.
+        """
+
+        if device != "cuda":
+            return {}
+
+        import torch
+
+        kwargs: Dict[str, object] = {"device_map": "auto", "torch_dtype": torch.float16}
+        if self.config.quantization is None:
+            return kwargs
+        try:
+            import bitsandbytes  # noqa: F401
+            from transformers import BitsAndBytesConfig
+        except ImportError:
+            logger.warning("bitsandbytes unavailable; loading FP16 weights without quantization")
+            return kwargs
+
+        if self.config.quantization == "nf4":
+            kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_use_double_quant=True,
+            )
         else:
-            max_length = model_max_length
+            kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+        logger.info("Loading weights with %s quantization", self.config.quantization)
+        return kwargs
 
-        max_input_tokens = max_length - self.config.max_new_tokens
-        if max_input_tokens < 1:
-            max_input_tokens = max_length
+    def generate(self, prompt: str) -> str:
+        if self._model is None or self._tokenizer is None:
+            self.load()
 
+        max_length, max_input_tokens = self._length_budget()
         inputs = self._tokenizer(
             prompt,
             return_tensors="pt",
             truncation=True,
             max_length=max_input_tokens,
-        )
+        ).to(self._model.device)
+        if self._compiled:
+            inputs = self._pad_to_bucket(inputs, max_input_tokens)
         max_available = max_length - inputs["input_ids"].shape[1]
         max_new_tokens = max(1, min(self.config.max_new_tokens, max_available))
+        # Left padding shifts the prefix, so the prefix cache and bucketing
+        # are mutually exclusive.
+        use_prefix = self.config.prefix_cache and not self._compiled
+        past_key_values = self._prefix_past(inputs["input_ids"]) if use_prefix else None
         output_ids = self._model.generate(
-            **inputs,
+            input_ids=inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            past_key_values=past_key_values,
             max_new_tokens=max_new_tokens,
             temperature=self.config.temperature,
             top_p=self.config.top_p,
             repetition_penalty=self.config.repetition_penalty,
             do_sample=False,
             eos_token_id=self._tokenizer.eos_token_id,
+            pad_token_id=self._tokenizer.pad_token_id,
+            stopping_criteria=self._stopping_criteria(inputs["input_ids"].shape[1]),
         )
         decoded = self._tokenizer.decode(output_ids[0], skip_special_tokens=True)
         return decoded
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        """
+        Generate completions for several prompts with padded batched calls.
+
+        Prompts are processed in chunks of config.max_batch_size so weight reads
+        are amortized across the batch while the KV cache stays bounded.
+        """
+
+        if not prompts:
+            return []
+        if self._model is None or self._tokenizer is None:
+            self.load()
+
+        max_length, max_input_tokens = self._length_budget()
+        outputs: List[str] = []
+        for offset in range(0, len(prompts), self.config.max_batch_size):
+            chunk = prompts[offset : offset + self.config.max_batch_size]
+            inputs = self._tokenizer(
+                chunk,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=max_input_tokens,
+            ).to(self._model.device)
+            max_available = max_length - inputs["input_ids"].shape[1]
+            max_new_tokens = max(1, min(self.config.max_new_tokens, max_available))
+            output_ids = self._model.generate(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_new_tokens=max_new_tokens,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                repetition_penalty=self.config.repetition_penalty,
+                do_sample=False,
+                eos_token_id=self._tokenizer.eos_token_id,
+                pad_token_id=self._tokenizer.pad_token_id,
+                stopping_criteria=self._stopping_criteria(inputs["input_ids"].shape[1]),
+            )
+            outputs.extend(self._tokenizer.batch_decode(output_ids, skip_special_tokens=True))
+        return outputs
+
+    def _stopping_criteria(self, prompt_length: int) -> Optional[StoppingCriteriaList]:
+        if not self.config.stop_at_json_end:
+            return None
+        return StoppingCriteriaList([_StopAtJsonEnd(self._tokenizer, prompt_length)])
+
+    def _pad_to_bucket(self, inputs, max_input_tokens: int):
+        """Left-pad inputs to the next power-of-two length (capped at max_input_tokens)."""
+        length = inputs["input_ids"].shape[1]
+        bucket = min(1 << (length - 1).bit_length(), max(length, max_input_tokens))
+        if bucket == length:
+            return inputs
+        return self._tokenizer.pad(
+            inputs, padding="max_length", max_length=bucket, return_tensors="pt"
+        ).to(self._model.device)
+
+    def _prefix_past(self, input_ids) -> Optional[object]:
+        """
+        Return a copy of the PROMPT_PREFIX KV cache if input_ids start with it.
+
+        The prefix is run through the model once; later calls only prefill the
+        incident-specific tail. Returns None (full prefill) when the prompt
+        does not tokenize to the cached prefix ids.
+        """
+
+        import torch
+
+        if self._prefix_cache is None:
+            prefix_ids = self._tokenizer(PROMPT_PREFIX, return_tensors="pt")["input_ids"]
+            self._prefix_cache = (prefix_ids.to(self._model.device), None)
+
+        prefix_ids, past = self._prefix_cache
+        prefix_len = prefix_ids.shape[1]
+        if input_ids.shape[1] <= prefix_len or not torch.equal(input_ids[0, :prefix_len], prefix_ids[0]):
+            return None
+        if past is None:
+            with torch.no_grad():
+                past = self._model(input_ids=prefix_ids, use_cache=True).past_key_values
+            self._prefix_cache = (prefix_ids, past)
+        # generate() extends the cache in place; hand it a private copy.
+        return copy.deepcopy(past)
+
+    def _length_budget(self) -> Tuple[int, int]:
+        """Return (max total length, max input tokens) for the loaded model."""
+        max_positions = getattr(self._model.config, "n_positions", None) or getattr(
+            self._model.config, "max_position_embeddings", None
+        )
+        model_max_length = self._tokenizer.model_max_length
+        if max_positions:
+            max_length = min(model_max_length, max_positions)
+        else:
+            max_length = model_max_length
+
+        max_input_tokens = max_length - self.config.max_new_tokens
+        if max_input_tokens < 1:
+            max_input_tokens = max_length
+        return max_length, max_input_tokens
@@ -8,10 +8,72 @@ and references only the provided incident context and allowed option lists.
 from __future__ import annotations
 
 import json
-from typing import List
+import weakref
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from backend.incident.schema import Incident
 
+# Final prompt line; decoded model output echoes the prompt, so the answer
+# starts after the last occurrence of this marker.
+RESPONSE_MARKER = "RETURN_JSON_ONLY:"
+
+
+_INSTRUCTIONS = {
+    "task": "Explain the incident using only provided facts.",
+    "constraints": [
+        "Return a single JSON object only.",
+        "Do NOT include any text outside JSON.",
+        "Use only allowed values for probable_causes, supporting_evidence, and recommended_next_steps.",
+        "Do NOT invent facts beyond the incident data.",
+        "If uncertain, state limitations clearly.",
+    ],
+    "schema": {
+        "incident_id": "string",
+        "summary": "string",
+        "probable_causes": "list[string]",
+        "supporting_evidence": "list[string]",
+        "confidence_score": "float in [0,1]",
+        "recommended_next_steps": "list[string]",
+        "limitations": "string",
+    },
+}
+
+# Incident-independent opening shared by every prompt; the model wrapper can
+# reuse its KV cache across calls.
+PROMPT_PREFIX = (
+    "You are a reliability assistant. Use ONLY the incident data and allowed lists.\n"
+    f"INSTRUCTIONS: {json.dumps(_INSTRUCTIONS, sort_keys=True)}\n"
+)
+
+
+# id(incident) -> serialized payload. Incidents are frozen, so a payload stays
+# valid for the incident's lifetime; entries are dropped when it is collected.
+_PAYLOAD_CACHE: Dict[int, str] = {}
+
+
+def _incident_payload(incident: Incident) -> str:
+    """
+    Serialized incident, computed once per Incident object.
+
+    Stays on stdlib json with default=str: the LoRA adapter was trained on
+    prompts in exactly this format, so the text must not change.
+    """
+
+    key = id(incident)
+    payload = _PAYLOAD_CACHE.get(key)
+    if payload is None:
+        payload = json.dumps(incident.model_dump(), sort_keys=True, default=str)
+        _PAYLOAD_CACHE[key] = payload
+        weakref.finalize(incident, _PAYLOAD_CACHE.pop, key, None)
+    return payload
+
+
+@lru_cache(maxsize=256)
+def _sorted_json(items: Tuple[str, ...]) -> str:
+    """Serialized sorted allowed list; cause and step lists recur across incidents."""
+    return json.dumps(sorted(items))
+
 
 def build_prompt(
     incident: Incident,
@@ -26,36 +88,15 @@ def build_prompt(
     recommended_next_steps from the provided allowed lists only.
     """
 
-    incident_payload = json.dumps(incident.model_dump(), sort_keys=True, default=str)
-
-    instructions = {
-        "task": "Explain the incident using only provided facts.",
-        "constraints": [
-            "Return a single JSON object only.",
-            "Do NOT include any text outside JSON.",
-            "Use only allowed values for probable_causes, supporting_evidence, and recommended_next_steps.",
-            "Do NOT invent facts beyond the incident data.",
-            "If uncertain, state limitations clearly.",
-        ],
-        "schema": {
-            "incident_id": "string",
-            "summary": "string",
-            "probable_causes": "list[string]",
-            "supporting_evidence": "list[string]",
-            "confidence_score": "float in [0,1]",
-            "recommended_next_steps": "list[string]",
-            "limitations": "string",
-        },
-    }
+    incident_payload = _incident_payload(incident)
 
     prompt = (
-        "You are a reliability assistant. Use ONLY the incident data and allowed lists.\n"
-        f"INSTRUCTIONS: {json.dumps(instructions, sort_keys=True)}\n"
+        f"{PROMPT_PREFIX}"
         f"INCIDENT: {incident_payload}\n"
-        f"ALLOWED_CAUSES: {json.dumps(sorted(allowed_causes))}\n"
-        f"ALLOWED_EVIDENCE: {json.dumps(sorted(allowed_evidence))}\n"
-        f"ALLOWED_STEPS: {json.dumps(sorted(allowed_steps))}\n"
-        "RETURN_JSON_ONLY:"
+        f"ALLOWED_CAUSES: {_sorted_json(tuple(allowed_causes))}\n"
+        f"ALLOWED_EVIDENCE: {_sorted_json(tuple(allowed_evidence))}\n"
+        f"ALLOWED_STEPS: {_sorted_json(tuple(allowed_steps))}\n"
+        f"{RESPONSE_MARKER}"
     )
 
     return prompt
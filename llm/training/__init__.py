@@ -4,13 +4,14 @@ LoRA fine-tuning utilities for Phase 5.
 
 from .config import TrainingConfig
 from .schema import TrainingSample
-from .dataset import build_training_prompt, load_training_samples
+from .dataset import build_training_prompt, iter_training_samples, load_training_samples
 from .adapters import load_lora_adapter, set_active_adapter
 
 __all__ = [
     "TrainingConfig",
     "TrainingSample",
     "build_training_prompt",
+    "iter_training_samples",
     "load_training_samples",
     "load_lora_adapter",
     "set_active_adapter",
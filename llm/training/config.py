@@ -6,7 +6,7 @@ Conservative defaults prioritize stability and avoid overfitting.
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -18,13 +18,21 @@ class TrainingConfig(BaseModel):
     Notes:
     - target_modules restricted to attention projections for parameter efficiency.
     - low learning rate and small epochs reduce overfitting risk.
+    - load_in_4bit trains adapters over an NF4-quantized base (QLoRA) on CUDA.
+    - gradient checkpointing and paged 8-bit AdamW (4-bit runs) free memory for larger batches.
+    - compile relies on pad_to_multiple_of and length grouping to bound recompiles.
     - max_seq_length caps prompt + output length for memory control.
+    - tokenized datasets are cached under dataset_cache_dir and reused across runs.
     """
 
     model_path: str = Field(..., description="Local filesystem path to base model")
     dataset_path: str = Field(..., description="Path to JSONL training data")
     output_dir: str = Field("llm/artifacts/lora", description="Adapter output dir")
 
+    load_in_4bit: bool = Field(True, description="Load the base model in 4-bit NF4 (CUDA only)")
+    compile: bool = Field(False, description="torch.compile the model during training (CUDA only)")
+    gradient_checkpointing: bool = Field(True, description="Recompute activations in backward to save memory")
+
     seed: int = Field(42, ge=0)
     num_train_epochs: int = Field(3, ge=1, le=10)
     per_device_train_batch_size: int = Field(1, ge=1, le=16)
@@ -34,6 +42,10 @@ class TrainingConfig(BaseModel):
     warmup_steps: int = Field(10, ge=0)
 
     max_seq_length: int = Field(1536, ge=256, le=4096)
+    dataset_cache_dir: Optional[str] = Field(
+        "llm/artifacts/dataset_cache", description="Tokenized dataset cache dir (None disables)"
+    )
+    preprocessing_num_workers: int = Field(1, ge=1, le=64)
 
     lora_r: int = Field(8, ge=2, le=64)
     lora_alpha: int = Field(16, ge=4, le=128)
@@ -7,30 +7,46 @@ Converts Incident + Explanation pairs into supervised prompt-completion samples.
 from __future__ import annotations
 
 import json
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from backend.incident.schema import Incident
+from backend.timefmt import iso_format
+from llm.allowed import (
+    CAUSE_DEPLOYMENT,
+    CAUSE_FEATURES,
+    CAUSE_TO_STEP,
+    CAUSE_UNKNOWN,
+    FEATURE_TO_CAUSE,
+    STEP_VALIDATE_SCOPE,
+)
 from llm.prompt import build_prompt
 from llm.schema import Explanation
 
 from .schema import TrainingSample
 
 
-def load_training_samples(path: str) -> List[TrainingSample]:
+def iter_training_samples(path: str) -> Iterator[TrainingSample]:
     """
-    Load JSONL training samples from disk.
+    Stream JSONL training samples from disk, one validated sample per line.
 
     Each line must be a JSON object with keys: incident, explanation.
     """
 
-    samples: List[TrainingSample] = []
-    with open(path, "r", encoding="utf-8") as f:
+    # pydantic-core parses and validates each line in one pass, with no
+    # intermediate dict.
+    with open(path, "rb") as f:
         for line in f:
             if not line.strip():
                 continue
-            payload = json.loads(line)
-            samples.append(TrainingSample(**payload))
-    return samples
+            yield TrainingSample.model_validate_json(line)
+
+
+def load_training_samples(path: str) -> List[TrainingSample]:
+    """
+    Load all JSONL training samples from disk into a list.
+    """
+
+    return list(iter_training_samples(path))
 
 
 def build_training_prompt(sample: TrainingSample) -> str:
@@ -49,71 +65,57 @@ def build_training_prompt(sample: TrainingSample) -> str:
 def format_completion(sample: TrainingSample) -> str:
     """
     Format the target completion as JSON for supervised fine-tuning.
+
+    Stays on json.dumps: its spacing and ASCII escaping are the exact target
+    text existing adapters were trained on, which orjson would not reproduce.
     """
 
     return json.dumps(sample.explanation.model_dump(), sort_keys=True)
 
 
 def _allowed_causes(incident: Incident) -> List[str]:
-    causes = {"unknown"}
-
-    for event in incident.anomalies:
-        for anomaly in event.anomalies:
-            feature = anomaly.feature
-            if feature in {"error_rate", "error_count"}:
-                causes.add("error_rate_spike")
-            if feature in {"warning_rate", "warning_count"}:
-                causes.add("warning_spike")
-            if feature in {"median_duration_ms", "p95_duration_ms", "max_duration_ms"}:
-                causes.add("latency_regression")
-            if feature in {"total_events", "info_count"}:
-                causes.add("traffic_spike")
-            if feature in {"unique_messages", "unique_error_codes"}:
-                causes.add("error_variation")
-
-    for op in incident.operational_context:
-        if "deploy" in op.event_type.lower():
-            causes.add("deployment_change")
+    features = {anomaly.feature for event in incident.anomalies for anomaly in event.anomalies}
+    causes = {CAUSE_UNKNOWN}
+    causes.update(FEATURE_TO_CAUSE[feature] for feature in features & CAUSE_FEATURES)
+
+    if any("deploy" in op.event_type.lower() for op in incident.operational_context):
+        causes.add(CAUSE_DEPLOYMENT)
 
     return sorted(causes)
 
 
 def _allowed_evidence(incident: Incident) -> List[str]:
-    evidence = set()
-    evidence.add(f"service={incident.service}")
-    evidence.add(f"start_time={incident.start_time.isoformat()}")
-    evidence.add(f"end_time={incident.end_time.isoformat()}")
-    evidence.add(f"max_score={incident.metrics_summary.max_score:.2f}")
-
-    for event in incident.anomalies:
-        evidence.add(f"window_start={event.window_start.isoformat()}")
-        evidence.add(f"severity={event.severity}")
-        for anomaly in event.anomalies:
-            evidence.add(f"feature={anomaly.feature}")
-            evidence.add(f"direction={anomaly.direction}")
-
-    for pattern in incident.log_patterns:
-        evidence.add(f"log_pattern={pattern.key}|count={pattern.count}")
-
-    for op in incident.operational_context:
-        evidence.add(f"op_event={op.event_type}|time={op.timestamp.isoformat()}")
-
-    return sorted(evidence)
+    events = incident.anomalies
+    features = {anomaly.feature for event in events for anomaly in event.anomalies}
+    directions = {anomaly.direction for event in events for anomaly in event.anomalies}
+
+    # Each group has its own key prefix, so deduping within a group is enough;
+    # repeated features/directions are collapsed before they are formatted.
+    evidence = [
+        f"service={incident.service}",
+        f"start_time={iso_format(incident.start_time)}",
+        f"end_time={iso_format(incident.end_time)}",
+        f"max_score={incident.metrics_summary.max_score:.2f}",
+    ]
+    evidence.extend({f"window_start={iso_format(event.window_start)}" for event in events})
+    evidence.extend({f"severity={event.severity}" for event in events})
+    evidence.extend(f"feature={feature}" for feature in features)
+    evidence.extend(f"direction={direction}" for direction in directions)
+    evidence.extend(
+        {f"log_pattern={pattern.key}|count={pattern.count}" for pattern in incident.log_patterns}
+    )
+    evidence.extend(
+        {
+            f"op_event={op.event_type}|time={iso_format(op.timestamp)}"
+            for op in incident.operational_context
+        }
+    )
+
+    evidence.sort()
+    return evidence
 
 
 def _allowed_steps(incident: Incident, causes: List[str]) -> List[str]:
-    steps = set()
-
-    if "deployment_change" in causes:
-        steps.add("Review recent deployments in the incident window")
-    if "error_rate_spike" in causes or "warning_spike" in causes:
-        steps.add("Inspect error and warning logs for the affected service")
-    if "latency_regression" in causes:
-        steps.add("Check latency metrics and downstream dependencies")
-    if "traffic_spike" in causes:
-        steps.add("Verify traffic sources and request patterns")
-    if "error_variation" in causes:
-        steps.add("Group errors by code to identify new patterns")
-
-    steps.add("Validate incident scope and confirm if impact persists")
+    steps = {CAUSE_TO_STEP[cause] for cause in causes if cause in CAUSE_TO_STEP}
+    steps.add(STEP_VALIDATE_SCOPE)
     return sorted(steps)
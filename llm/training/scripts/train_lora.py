@@ -1,3 +1,4 @@
+import os
 import random
 
 import numpy as np
@@ -48,19 +49,28 @@ dataset = load_dataset(
     }
 )
 
-def format_example(example):
-    text = f"""<incident>
-{example['input']}
+def format_examples(batch):
+    texts = [
+        f"""<incident>
+{incident}
 </incident>
 
 <explanation>
-{example['output']}
+{explanation}
 </explanation>"""
-    tokenized = tokenizer(text, truncation=True)
-    tokenized["labels"] = tokenized["input_ids"].copy()
+        for incident, explanation in zip(batch["input"], batch["output"])
+    ]
+    tokenized = tokenizer(texts, truncation=True)
+    tokenized["labels"] = [ids.copy() for ids in tokenized["input_ids"]]
     return tokenized
 
-tokenized = dataset.map(format_example, remove_columns=dataset["train"].column_names)
+tokenized = dataset.map(
+    format_examples,
+    batched=True,
+    batch_size=1000,
+    num_proc=os.cpu_count(),
+    remove_columns=dataset["train"].column_names,
+)
 
 args = TrainingArguments(
     output_dir="llm/models/lora",
@@ -7,58 +7,182 @@ leaving base model weights unchanged.
 
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
-from typing import Dict, List
+import logging
+import shutil
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
 import torch
-from peft import LoraConfig, get_peft_model
-from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer, TrainingArguments
+from datasets import Dataset, Features, Value, load_from_disk
+from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    DataCollatorForSeq2Seq,
+    Trainer,
+    TrainingArguments,
+)
+from transformers.utils import is_flash_attn_2_available
 
 from .config import TrainingConfig
-from .dataset import build_training_prompt, format_completion, load_training_samples
+from .dataset import build_training_prompt, format_completion, iter_training_samples
 
+logger = logging.getLogger("llm")
 
-@dataclass
-class _TokenizedSample:
-    input_ids: List[int]
-    attention_mask: List[int]
-    labels: List[int]
+_CACHE_FORMAT = 4
+_IGNORE_INDEX = -100
+_CHECKPOINTING_KWARGS = {"use_reentrant": False}
+_ROW_FEATURES = Features({"prompt": Value("string"), "completion": Value("string")})
 
 
-def _tokenize_sample(tokenizer, prompt: str, completion: str, max_length: int) -> _TokenizedSample:
-    text = prompt + completion
-    encoded = tokenizer(
-        text,
-        truncation=True,
-        max_length=max_length,
-        padding="max_length",
-    )
-    labels = encoded["input_ids"].copy()
-    return _TokenizedSample(
-        input_ids=encoded["input_ids"],
-        attention_mask=encoded["attention_mask"],
-        labels=labels,
-    )
+def _tokenize_batch(batch: Dict[str, List[str]], tokenizer, max_length: int) -> Dict[str, List]:
+    texts = [prompt + completion for prompt, completion in zip(batch["prompt"], batch["completion"])]
+    # Left unpadded; the collator pads each batch to its own longest sample.
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    prompt_lengths = [len(ids) for ids in tokenizer(batch["prompt"])["input_ids"]]
+
+    # Loss covers the JSON completion only; prompt positions are ignored.
+    # Rows whose prompt fills max_length lose the whole completion to
+    # truncation and would train on zero tokens, so they are dropped.
+    rows: Dict[str, List] = {"input_ids": [], "attention_mask": [], "labels": [], "length": []}
+    for ids, mask, prompt_length in zip(encoded["input_ids"], encoded["attention_mask"], prompt_lengths):
+        if prompt_length >= len(ids):
+            continue
+        rows["input_ids"].append(ids)
+        rows["attention_mask"].append(mask)
+        rows["labels"].append([_IGNORE_INDEX] * prompt_length + list(ids[prompt_length:]))
+        rows["length"].append(len(ids))
+    return rows
+
+
+def _dataset_fingerprint(tokenizer, config: TrainingConfig) -> str:
+    digest = hashlib.sha256()
+    with open(config.dataset_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(f"{_CACHE_FORMAT}|{tokenizer.name_or_path}|{len(tokenizer)}|{config.max_seq_length}".encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 
-def _build_dataset(tokenizer, config: TrainingConfig) -> List[Dict[str, List[int]]]:
-    samples = load_training_samples(config.dataset_path)
-    dataset = []
-    for sample in samples:
-        prompt = build_training_prompt(sample)
-        completion = format_completion(sample)
-        tokenized = _tokenize_sample(tokenizer, prompt, completion, config.max_seq_length)
-        dataset.append(
-            {
-                "input_ids": tokenized.input_ids,
-                "attention_mask": tokenized.attention_mask,
-                "labels": tokenized.labels,
-            }
+def _iter_rows(path: str, fingerprint: str) -> Iterator[Dict[str, str]]:
+    for sample in iter_training_samples(path):
+        yield {"prompt": build_training_prompt(sample), "completion": format_completion(sample)}
+
+
+def _build_dataset(tokenizer, config: TrainingConfig) -> Dataset:
+    """
+    Tokenize the training set into an Arrow dataset.
+
+    With dataset_cache_dir set, the result is saved to disk keyed by the
+    dataset contents, tokenizer and max_seq_length, and reused on later runs.
+    """
+
+    fingerprint = _dataset_fingerprint(tokenizer, config)
+    cache_path: Optional[Path] = None
+    if config.dataset_cache_dir:
+        cache_path = Path(config.dataset_cache_dir) / fingerprint
+        if cache_path.exists():
+            logger.info("Reusing tokenized dataset from %s", cache_path)
+            return load_from_disk(str(cache_path))
+
+    # Rows stream straight into Arrow; no list of samples or prompts is held.
+    # The fingerprint keys the datasets generator cache to the file contents.
+    dataset = Dataset.from_generator(
+        _iter_rows,
+        features=_ROW_FEATURES,
+        gen_kwargs={"path": config.dataset_path, "fingerprint": fingerprint},
+    )
+    sample_count = len(dataset)
+    dataset = dataset.map(
+        partial(_tokenize_batch, tokenizer=tokenizer, max_length=config.max_seq_length),
+        batched=True,
+        num_proc=config.preprocessing_num_workers if sample_count > 1 else None,
+        remove_columns=["prompt", "completion"],
+    )
+    dropped = sample_count - len(dataset)
+    if dropped:
+        logger.warning(
+            "Dropped %d of %d samples whose prompt fills max_seq_length=%d",
+            dropped,
+            sample_count,
+            config.max_seq_length,
         )
+    if not len(dataset):
+        raise ValueError("No training samples fit within max_seq_length")
+
+    if cache_path is not None:
+        # Write beside the final path and rename, so an interrupted save never
+        # leaves a partial cache that later runs would try to load.
+        partial_path = cache_path.with_name(f"{cache_path.name}.partial")
+        shutil.rmtree(partial_path, ignore_errors=True)
+        dataset.save_to_disk(str(partial_path))
+        partial_path.rename(cache_path)
+        logger.info("Cached tokenized dataset at %s", cache_path)
+        return load_from_disk(str(cache_path))
     return dataset
 
 
+def _length_grouping_kwargs() -> Dict[str, object]:
+    # Batches of similar length keep per-batch padding small. transformers 5
+    # replaced group_by_length with train_sampling_strategy.
+    if "train_sampling_strategy" in TrainingArguments.__dataclass_fields__:
+        return {"train_sampling_strategy": "group_by_length"}
+    return {"group_by_length": True}
+
+
+def _compute_dtype() -> torch.dtype:
+    # bf16 needs no loss scaling; prefer it wherever the GPU supports it.
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float16
+
+
+def _attn_implementation() -> str:
+    # FlashAttention-2 needs an Ampere+ GPU and the flash-attn package (gpu
+    # extra); PyTorch's fused SDPA kernels are always available otherwise.
+    if (
+        torch.cuda.is_available()
+        and torch.cuda.get_device_capability()[0] >= 8
+        and is_flash_attn_2_available()
+    ):
+        return "flash_attention_2"
+    return "sdpa"
+
+
+def _model_kwargs(config: TrainingConfig) -> Dict[str, object]:
+    """
+    from_pretrained kwargs for the frozen base model.
+
+    Attention runs through FlashAttention-2 or SDPA. On CUDA the base loads in
+    the mixed-precision dtype, as NF4 (QLoRA) with load_in_4bit; on CPU it
+    loads in its default precision.
+    """
+
+    kwargs: Dict[str, object] = {"attn_implementation": _attn_implementation()}
+    if not torch.cuda.is_available():
+        if config.load_in_4bit:
+            logger.warning("CUDA unavailable; training on a full-precision base model")
+        return kwargs
+
+    kwargs["torch_dtype"] = _compute_dtype()
+    if not config.load_in_4bit:
+        return kwargs
+
+    from transformers import BitsAndBytesConfig
+
+    kwargs["device_map"] = "auto"
+    kwargs["quantization_config"] = BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_compute_dtype=_compute_dtype(),
+        bnb_4bit_use_double_quant=True,
+    )
+    return kwargs
+
+
 def train_lora(config: TrainingConfig) -> None:
     """
     Run LoRA training and save adapters to output_dir.
@@ -66,8 +190,21 @@ def train_lora(config: TrainingConfig) -> None:
 
     torch.manual_seed(config.seed)
 
-    tokenizer = AutoTokenizer.from_pretrained(config.model_path, local_files_only=True)
-    model = AutoModelForCausalLM.from_pretrained(config.model_path, local_files_only=True)
+    tokenizer = AutoTokenizer.from_pretrained(config.model_path, local_files_only=True, use_fast=True)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model_kwargs = _model_kwargs(config)
+    model = AutoModelForCausalLM.from_pretrained(config.model_path, local_files_only=True, **model_kwargs)
+    quantized = "quantization_config" in model_kwargs
+    if quantized:
+        model = prepare_model_for_kbit_training(
+            model,
+            use_gradient_checkpointing=config.gradient_checkpointing,
+            gradient_checkpointing_kwargs=_CHECKPOINTING_KWARGS,
+        )
+    if config.gradient_checkpointing:
+        # The KV cache is useless during training and conflicts with recompute.
+        model.config.use_cache = False
 
     lora = LoraConfig(
         r=config.lora_r,
@@ -80,6 +217,8 @@ def train_lora(config: TrainingConfig) -> None:
     model = get_peft_model(model, lora)
 
     train_dataset = _build_dataset(tokenizer, config)
+    cuda = torch.cuda.is_available()
+    dtype = _compute_dtype()
 
     args = TrainingArguments(
         output_dir=config.output_dir,
@@ -92,11 +231,24 @@ def train_lora(config: TrainingConfig) -> None:
         logging_steps=10,
         save_steps=50,
         save_total_limit=2,
-        fp16=torch.cuda.is_available(),
+        bf16=cuda and dtype == torch.bfloat16,
+        fp16=cuda and dtype == torch.float16,
+        torch_compile=cuda and config.compile,
+        gradient_checkpointing=config.gradient_checkpointing,
+        gradient_checkpointing_kwargs=_CHECKPOINTING_KWARGS,
+        # Paged 8-bit AdamW states need bitsandbytes, which the 4-bit path has.
+        optim="paged_adamw_8bit" if quantized else "adamw_torch",
         report_to=[],
+        **_length_grouping_kwargs(),
+    )
+    collator = DataCollatorForSeq2Seq(
+        tokenizer=tokenizer,
+        padding=True,
+        pad_to_multiple_of=8,
+        label_pad_token_id=_IGNORE_INDEX,
     )
 
-    trainer = Trainer(model=model, args=args, train_dataset=train_dataset)
+    trainer = Trainer(model=model, args=args, train_dataset=train_dataset, data_collator=collator)
     trainer.train()
     model.save_pretrained(config.output_dir)
 
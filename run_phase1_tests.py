@@ -5,6 +5,7 @@ Quick reference: Running Phase 1 tests.
 Execute this file or use the commands below directly.
 """
 
+import importlib.util
 import subprocess
 import sys
 
@@ -17,14 +18,12 @@ def run_tests():
     print("=" * 70)
     print()
     
+    # One pytest session instead of one per file: collection and imports are
+    # paid once, and pytest-xdist (dev extra) spreads modules across cores.
+    parallel = " -n auto --dist=loadfile" if importlib.util.find_spec("xdist") else ""
     commands = [
-        ("Unit Tests - Schema", "pytest tests/unit/test_schema.py -v"),
-        ("Unit Tests - Parsers", "pytest tests/unit/test_parsers.py -v"),
-        ("Unit Tests - Normalizers", "pytest tests/unit/test_normalizers.py -v"),
-        ("Unit Tests - Aggregation", "pytest tests/unit/test_aggregation.py -v"),
-        ("Unit Tests - Features", "pytest tests/unit/test_features.py -v"),
-        ("Integration Tests - Pipeline", "pytest tests/integration/test_data_pipeline.py -v"),
-        ("All Tests with Coverage", "pytest tests/ -v --cov=src/data --cov-report=html"),
+        ("All Tests", f"pytest tests/ -v{parallel}"),
+        ("All Tests with Coverage", f"pytest tests/ -v --cov=src/data --cov-report=html{parallel}"),
     ]
     
     for name, cmd in commands:
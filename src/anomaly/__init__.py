@@ -8,7 +8,7 @@ from .baselines import BaselinePair, EWMABaselineEstimator, RollingStatsEstimato
 from .detectors import RateOfChangeDetector, ZScoreDetector
 from .engine import AnomalyEngine
 from .schema import AnomalyEvent, AnomalySeverity, BaselineStats, FeatureAnomaly
-from .scoring import SeverityMapper, combine_scores, overall_severity
+from .scoring import ScoreWeights, SeverityMapper, combine_scores, combine_scores_batch, mahalanobis_scores, overall_severity
 
 __all__ = [
 	"AnomalyEngine",
@@ -21,7 +21,10 @@ __all__ = [
 	"EWMABaselineEstimator",
 	"ZScoreDetector",
 	"RateOfChangeDetector",
+	"ScoreWeights",
 	"SeverityMapper",
 	"combine_scores",
+	"combine_scores_batch",
+	"mahalanobis_scores",
 	"overall_severity",
 ]
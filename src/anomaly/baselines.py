@@ -10,9 +10,9 @@ from __future__ import annotations
 from collections import deque
 from dataclasses import dataclass
 from math import sqrt
-from typing import Deque, Optional
+from typing import Deque, Iterable, Optional
 
-from .schema import BaselineStats
+from .schema import BaselineEstimate
 
 
 @dataclass
@@ -21,27 +21,74 @@ class RollingStatsEstimator:
     Rolling mean/std estimator.
 
     Warm-up: returns None until min_points are collected.
+    Mean and M2 (sum of squared deviations) are maintained incrementally with
+    Welford's add/remove updates, so peek() is O(1) in window_size.
     """
 
     window_size: int
     min_points: int
     std_floor: float
     _values: Deque[float] = None
+    _mean: float = 0.0
+    _m2: float = 0.0
+    _evictions: int = 0
 
     def __post_init__(self) -> None:
         self._values = deque(maxlen=self.window_size)
 
-    def peek(self) -> Optional[BaselineStats]:
-        if len(self._values) < self.min_points:
+    def peek(self) -> Optional[BaselineEstimate]:
+        count = len(self._values)
+        if count < self.min_points:
             return None
-        values = list(self._values)
-        mean = sum(values) / len(values)
-        variance = sum((v - mean) ** 2 for v in values) / len(values)
+        variance = max(self._m2, 0.0) / count
         std = max(sqrt(variance), self.std_floor)
-        return BaselineStats(mean=mean, std=std, count=len(values), method="rolling")
+        return BaselineEstimate(self._mean, std, count, "rolling")
 
     def update(self, value: float) -> None:
-        self._values.append(float(value))
+        value = float(value)
+        values = self._values
+        if len(values) == values.maxlen:
+            self._evictions += 1
+            if self._evictions >= self.window_size:
+                # Removal updates accumulate rounding error (badly so once a
+                # spike leaves the window); resync exactly once per window.
+                values.append(value)
+                self._resync()
+                return
+            evicted = values[0]
+            remaining = len(values) - 1
+            if remaining:
+                delta = evicted - self._mean
+                self._mean -= delta / remaining
+                self._m2 -= delta * (evicted - self._mean)
+            else:
+                self._mean = 0.0
+                self._m2 = 0.0
+        values.append(value)
+        delta = value - self._mean
+        self._mean += delta / len(values)
+        self._m2 += delta * (value - self._mean)
+
+    def seed(self, values: Iterable[float]) -> None:
+        """
+        Replace the window with values, as if they were the updates so far.
+
+        Only the last window_size values are kept, exactly as update() would.
+        """
+        self._values.clear()
+        self._values.extend(float(v) for v in values)
+        if self._values:
+            self._resync()
+        else:
+            self._mean = 0.0
+            self._m2 = 0.0
+            self._evictions = 0
+
+    def _resync(self) -> None:
+        values = self._values
+        self._mean = sum(values) / len(values)
+        self._m2 = sum((v - self._mean) ** 2 for v in values)
+        self._evictions = 0
 
     @property
     def last_value(self) -> Optional[float]:
@@ -64,26 +111,35 @@ class EWMABaselineEstimator:
     _var: Optional[float] = None
     _last: Optional[float] = None
 
-    def peek(self) -> Optional[BaselineStats]:
+    def peek(self) -> Optional[BaselineEstimate]:
         if self._count < self.min_points or self._mean is None or self._var is None:
             return None
         std = max(sqrt(self._var), self.std_floor)
-        return BaselineStats(mean=self._mean, std=std, count=self._count, method="ewma")
+        return BaselineEstimate(self._mean, std, self._count, "ewma")
 
     def update(self, value: float) -> None:
         value = float(value)
-        if self._mean is None:
+        mean = self._mean
+        if mean is None:
             self._mean = value
             self._var = 0.0
         else:
-            # EWMA update for mean
-            self._mean = self.alpha * value + (1.0 - self.alpha) * self._mean
-            # EWMA update for variance (using updated mean)
-            delta = value - self._mean
-            self._var = self.alpha * (delta**2) + (1.0 - self.alpha) * self._var
+            alpha = self.alpha
+            # EWMA update for mean, then variance around the updated mean.
+            mean = alpha * value + (1.0 - alpha) * mean
+            delta = value - mean
+            self._var = alpha * (delta * delta) + (1.0 - alpha) * self._var
+            self._mean = mean
         self._last = value
         self._count += 1
 
+    def seed(self, mean: float, var: float, count: int, last: float) -> None:
+        """Restore the state left by count updates ending with last."""
+        self._mean = float(mean)
+        self._var = float(var)
+        self._count = int(count)
+        self._last = float(last)
+
     @property
     def last_value(self) -> Optional[float]:
         return self._last
@@ -98,7 +154,7 @@ class BaselinePair:
     rolling: RollingStatsEstimator
     ewma: EWMABaselineEstimator
 
-    def peek(self, strategy: str) -> Optional[BaselineStats]:
+    def peek(self, strategy: str) -> Optional[BaselineEstimate]:
         rolling_stats = self.rolling.peek()
         ewma_stats = self.ewma.peek()
 
@@ -111,7 +167,7 @@ class BaselinePair:
                 mean = rolling_stats.mean
                 std = max(rolling_stats.std, ewma_stats.std)
                 count = min(rolling_stats.count, ewma_stats.count)
-                return BaselineStats(mean=mean, std=std, count=count, method="hybrid")
+                return BaselineEstimate(mean, std, count, "hybrid")
             return rolling_stats or ewma_stats
         raise ValueError(f"Unknown baseline strategy: {strategy}")
 
@@ -9,9 +9,9 @@ Implements explainable methods:
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 
-from .schema import BaselineStats
+from .schema import BaselineEstimate, BaselineStats
 
 
 @dataclass
@@ -24,7 +24,7 @@ class ZScoreDetector:
 
     min_std: float
 
-    def compute(self, observed: float, baseline: BaselineStats) -> Optional[float]:
+    def compute(self, observed: float, baseline: Union[BaselineEstimate, BaselineStats]) -> Optional[float]:
         if baseline.std < self.min_std:
             return None
         return (observed - baseline.mean) / baseline.std
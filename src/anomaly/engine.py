@@ -7,9 +7,15 @@ computes scores, and aggregates anomalies into events.
 
 from __future__ import annotations
 
+from copy import copy
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Iterable, List, Optional, Tuple
+from math import isnan, nan
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
 
 from src.core.config import config
 from src.data.schema import FeatureVector
@@ -17,7 +23,39 @@ from src.data.schema import FeatureVector
 from .baselines import BaselinePair, EWMABaselineEstimator, RollingStatsEstimator
 from .detectors import RateOfChangeDetector, ZScoreDetector
 from .schema import AnomalyEvent, AnomalySeverity, FeatureAnomaly
-from .scoring import SeverityMapper, combine_scores, overall_severity
+from .scoring import _SEVERITY_BY_RANK, ScoreWeights, SeverityMapper, combine_scores_batch, overall_severity
+
+_FEATURE_NAMES = (
+    "total_events",
+    "error_count",
+    "warning_count",
+    "info_count",
+    "error_rate",
+    "warning_rate",
+    "median_duration_ms",
+    "p95_duration_ms",
+    "max_duration_ms",
+    "unique_messages",
+    "unique_error_codes",
+)
+# Read straight off the model; model_dump() per window was the hot allocation.
+_FEATURE_GETTERS = tuple((name, attrgetter(name)) for name in _FEATURE_NAMES)
+_ANOMALY_COLUMNS = (
+    "row",
+    "feature",
+    "value",
+    "baseline_mean",
+    "baseline_std",
+    "z_score",
+    "rate_change",
+    "score",
+    "severity",
+)
+
+
+def _ungroup(result: pd.Series) -> pd.Series:
+    # groupby().rolling/ewm prepend the group keys; restore the frame's order.
+    return result.droplevel([0, 1]).sort_index()
 
 
 @dataclass
@@ -32,10 +70,12 @@ class AnomalyEngine:
     """
 
     def __post_init__(self) -> None:
-        self._baselines: Dict[Tuple[str, str], BaselinePair] = {}
+        # service -> baseline pair per feature, indexed like _FEATURE_NAMES.
+        self._baselines: Dict[str, List[Optional[BaselinePair]]] = {}
         self._z_detector = ZScoreDetector(min_std=config.anomaly.baselines.std_floor)
         self._roc_detector = RateOfChangeDetector()
         self._severity_mapper = SeverityMapper(config.anomaly.thresholds)
+        self._score_weights = ScoreWeights.from_config(config.anomaly.thresholds, config.anomaly.scoring)
 
     def detect(self, features: Iterable[FeatureVector]) -> List[AnomalyEvent]:
         events: List[AnomalyEvent] = []
@@ -47,11 +87,178 @@ class AnomalyEngine:
 
         return events
 
+    def detect_batch(self, features: Sequence[FeatureVector]) -> List[AnomalyEvent]:
+        """
+        Vectorized equivalent of detect() for a fresh engine.
+
+        Baselines only depend on each (service, feature) series, never on
+        detection outcomes, so every window's baseline, score and severity is
+        computed column-wise with pandas; pydantic objects are only built for
+        detected anomalies. Baseline state is left as detect() would leave it.
+        An engine that already holds baselines uses the streaming path.
+        """
+
+        if self._baselines or not features:
+            return self.detect(features)
+
+        frame = self._score_frame(features)
+        self._store_baselines(frame)
+
+        candidates = frame[frame["severity"] > 0]
+        if candidates.empty:
+            return []
+
+        columns = {name: candidates[name].to_numpy() for name in _ANOMALY_COLUMNS}
+        rows = columns["row"]
+        # Candidates are in (row, feature) order; split them into windows.
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+        events: List[AnomalyEvent] = []
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+            anomalies = [self._feature_anomaly(columns, i) for i in range(start, stop)]
+            if config.anomaly.suppress_redundant:
+                self._suppress_redundant(anomalies)
+            active = [a for a in anomalies if not a.suppressed]
+            fv = features[rows[start]]
+            events.append(
+                AnomalyEvent(
+                    service=fv.service,
+                    window_start=fv.window_start,
+                    detected_at=datetime.now(timezone.utc),
+                    severity=overall_severity(*(a.severity for a in active)),
+                    score=max(a.score for a in active),
+                    anomalies=active,
+                )
+            )
+        return events
+
+    def _score_frame(self, features: Sequence[FeatureVector]) -> pd.DataFrame:
+        baselines = config.anomaly.baselines
+        thresholds = config.anomaly.thresholds
+        scoring = config.anomaly.scoring
+
+        # Long (row, service, feature, value) layout; missing values are
+        # skipped exactly like detect() skips them, baseline updates included.
+        matrix = np.array(
+            [[getter(fv) for _, getter in _FEATURE_GETTERS] for fv in features], dtype=np.float64
+        )
+        width = len(_FEATURE_NAMES)
+        values = matrix.ravel()
+        present = ~np.isnan(values)
+        frame = pd.DataFrame(
+            {
+                "row": np.repeat(np.arange(len(features)), width)[present],
+                "service": np.repeat(np.array([fv.service for fv in features], dtype=object), width)[present],
+                "feature": np.tile(np.arange(width), len(features))[present],
+                "value": values[present],
+            }
+        )
+
+        series = [frame["service"], frame["feature"]]
+        grouped = frame.groupby(series, sort=False)["value"]
+        window, alpha = baselines.window_size, baselines.ewma_alpha
+        rolling = grouped.rolling(window, min_periods=1)
+        frame["roll_mean"] = _ungroup(rolling.mean())
+        frame["roll_var"] = _ungroup(rolling.var(ddof=0))
+        frame["ewma_mean"] = _ungroup(grouped.ewm(alpha=alpha, adjust=False).mean())
+        deviation = (frame["value"] - frame["ewma_mean"]) ** 2
+        frame["ewma_var"] = _ungroup(deviation.groupby(series, sort=False).ewm(alpha=alpha, adjust=False).mean())
+
+        # Each window is scored against the baseline of the points before it.
+        by_series = frame.groupby(series, sort=False)
+        seen = by_series.cumcount().to_numpy()
+        previous = by_series["value"].shift(1).to_numpy()
+        prior = {
+            column: by_series[column].shift(1).to_numpy()
+            for column in ("roll_mean", "roll_var", "ewma_mean", "ewma_var")
+        }
+
+        floor = baselines.std_floor
+        roll_ready = np.minimum(seen, window) >= baselines.min_points
+        ewma_ready = seen >= baselines.min_points
+        roll_std = np.maximum(np.sqrt(np.maximum(prior["roll_var"], 0.0)), floor)
+        ewma_std = np.maximum(np.sqrt(prior["ewma_var"]), floor)
+
+        strategy = baselines.strategy
+        if strategy == "rolling":
+            ready, mean, std = roll_ready, prior["roll_mean"], roll_std
+        elif strategy == "ewma":
+            ready, mean, std = ewma_ready, prior["ewma_mean"], ewma_std
+        elif strategy == "hybrid":
+            ready = roll_ready | ewma_ready
+            mean = np.where(roll_ready, prior["roll_mean"], prior["ewma_mean"])
+            std = np.where(
+                roll_ready & ewma_ready,
+                np.maximum(roll_std, ewma_std),
+                np.where(roll_ready, roll_std, ewma_std),
+            )
+        else:
+            raise ValueError(f"Unknown baseline strategy: {strategy}")
+
+        observed = frame["value"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zscore = np.where(std >= self._z_detector.min_std, (observed - mean) / std, np.nan)
+            rate = np.abs(observed - previous) / np.maximum(
+                np.abs(previous), self._roc_detector.epsilon
+            )
+
+        score = combine_scores_batch(zscore, rate, thresholds, scoring)
+
+        z_rank = self._severity_mapper.zscore_severities(zscore)
+        r_rank = self._severity_mapper.rate_change_severities(rate)
+        detected = ready & (score >= scoring.score_floor)
+
+        frame["seen"] = seen
+        frame["baseline_mean"] = mean
+        frame["baseline_std"] = std
+        frame["z_score"] = zscore
+        frame["rate_change"] = rate
+        frame["score"] = score
+        frame["severity"] = np.where(detected, np.maximum(z_rank, r_rank), 0)
+        return frame
+
+    def _feature_anomaly(self, columns: Dict[str, np.ndarray], i: int) -> FeatureAnomaly:
+        observed = float(columns["value"][i])
+        baseline_mean = float(columns["baseline_mean"][i])
+        zscore = float(columns["z_score"][i])
+        rate_change = float(columns["rate_change"][i])
+        return FeatureAnomaly(
+            feature=_FEATURE_NAMES[columns["feature"][i]],
+            observed=observed,
+            baseline_mean=baseline_mean,
+            baseline_std=float(columns["baseline_std"][i]),
+            z_score=None if isnan(zscore) else zscore,
+            rate_change=None if isnan(rate_change) else rate_change,
+            score=float(columns["score"][i]),
+            severity=_SEVERITY_BY_RANK[columns["severity"][i]],
+            direction="high" if observed >= baseline_mean else "low",
+        )
+
+    def _store_baselines(self, frame: pd.DataFrame) -> None:
+        window = config.anomaly.baselines.window_size
+        for (service, feature), series in frame.groupby(["service", "feature"], sort=False):
+            pair = self._create_baseline_pair()
+            pair.rolling.seed(series["value"].to_numpy()[-window:].tolist())
+            last = series.iloc[-1]
+            pair.ewma.seed(last["ewma_mean"], last["ewma_var"], len(series), last["value"])
+            self._service_baselines(service)[feature] = pair
+
+    def fresh(self) -> "AnomalyEngine":
+        """
+        New engine with no baselines, sharing this one's detectors and scoring.
+
+        Those parts are read-only after construction, so any number of fresh
+        engines can run concurrently off one template.
+        """
+        engine = copy(self)
+        engine._baselines = {}
+        return engine
+
     def _detect_window(self, fv: FeatureVector) -> Optional[AnomalyEvent]:
         anomalies: List[FeatureAnomaly] = []
+        baselines = self._service_baselines(fv.service)
 
-        for feature_name, value in self._iter_feature_values(fv):
-            anomaly = self._detect_feature(fv, feature_name, value)
+        for index, feature_name, value in self._iter_feature_values(fv):
+            anomaly = self._detect_feature(baselines, index, feature_name, value)
             if anomaly is not None and anomaly.severity != AnomalySeverity.NONE:
                 anomalies.append(anomaly)
 
@@ -77,14 +284,22 @@ class AnomalyEngine:
             anomalies=active,
         )
 
+    def _service_baselines(self, service: str) -> List[Optional[BaselinePair]]:
+        baselines = self._baselines.get(service)
+        if baselines is None:
+            baselines = self._baselines[service] = [None] * len(_FEATURE_NAMES)
+        return baselines
+
     def _detect_feature(
-        self, fv: FeatureVector, feature_name: str, observed: float
+        self,
+        baselines: List[Optional[BaselinePair]],
+        index: int,
+        feature_name: str,
+        observed: float,
     ) -> Optional[FeatureAnomaly]:
-        key = (fv.service, feature_name)
-        baseline_pair = self._baselines.get(key)
+        baseline_pair = baselines[index]
         if baseline_pair is None:
-            baseline_pair = self._create_baseline_pair()
-            self._baselines[key] = baseline_pair
+            baseline_pair = baselines[index] = self._create_baseline_pair()
 
         baseline = baseline_pair.peek(config.anomaly.baselines.strategy)
         previous_value = baseline_pair.last_value
@@ -93,41 +308,49 @@ class AnomalyEngine:
             baseline_pair.update(observed)
             return None
 
-        zscore = self._z_detector.compute(observed, baseline)
-        roc = self._roc_detector.compute(observed, previous_value)
-
-        score = combine_scores(
-            zscore=zscore,
-            rate_change=roc,
-            thresholds=config.anomaly.thresholds,
-            scoring=config.anomaly.scoring,
+        zscore, roc, score, rank = self._score_and_severity(
+            observed, baseline.mean, baseline.std, previous_value
         )
-
         if score < config.anomaly.scoring.score_floor:
             baseline_pair.update(observed)
             return None
 
-        z_sev = self._severity_mapper.zscore_severity(zscore)
-        roc_sev = self._severity_mapper.rate_change_severity(roc)
-        severity = overall_severity(z_sev, roc_sev)
-
-        direction = "high" if observed >= baseline.mean else "low"
-
         anomaly = FeatureAnomaly(
             feature=feature_name,
             observed=observed,
             baseline_mean=baseline.mean,
             baseline_std=baseline.std,
-            z_score=zscore,
-            rate_change=roc,
+            z_score=None if isnan(zscore) else zscore,
+            rate_change=None if isnan(roc) else roc,
             score=score,
-            severity=severity,
-            direction=direction,
+            severity=_SEVERITY_BY_RANK[rank],
+            direction="high" if observed >= baseline.mean else "low",
         )
 
         baseline_pair.update(observed)
         return anomaly
 
+    def _score_and_severity(
+        self, observed: float, mean: float, std: float, previous: Optional[float]
+    ) -> Tuple[float, float, float, int]:
+        """
+        Z-score, rate of change, combined score and severity rank in one pass.
+
+        Unavailable deviations are NaN rather than None; the arithmetic matches
+        ZScoreDetector, RateOfChangeDetector, combine_scores and SeverityMapper.
+        """
+
+        zscore = (observed - mean) / std if std >= self._z_detector.min_std else nan
+        if previous is None:
+            roc = nan
+        else:
+            roc = abs(observed - previous) / max(abs(previous), self._roc_detector.epsilon)
+
+        score = self._score_weights.combine(zscore, roc)
+
+        rank = max(self._severity_mapper.zscore_rank(zscore), self._severity_mapper.rate_change_rank(roc))
+        return zscore, roc, score, rank
+
     def _create_baseline_pair(self) -> BaselinePair:
         rolling = RollingStatsEstimator(
             window_size=config.anomaly.baselines.window_size,
@@ -141,27 +364,12 @@ class AnomalyEngine:
         )
         return BaselinePair(rolling=rolling, ewma=ewma)
 
-    def _iter_feature_values(self, fv: FeatureVector) -> Iterable[Tuple[str, float]]:
-        data = fv.model_dump()
-        feature_fields = [
-            "total_events",
-            "error_count",
-            "warning_count",
-            "info_count",
-            "error_rate",
-            "warning_rate",
-            "median_duration_ms",
-            "p95_duration_ms",
-            "max_duration_ms",
-            "unique_messages",
-            "unique_error_codes",
-        ]
-
-        for name in feature_fields:
-            value = data.get(name)
+    def _iter_feature_values(self, fv: FeatureVector) -> Iterable[Tuple[int, str, float]]:
+        for index, (name, getter) in enumerate(_FEATURE_GETTERS):
+            value = getter(fv)
             if value is None:
                 continue
-            yield name, float(value)
+            yield index, name, float(value)
 
     def _suppress_redundant(self, anomalies: List[FeatureAnomaly]) -> None:
         families: Dict[str, List[FeatureAnomaly]] = {}
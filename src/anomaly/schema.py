@@ -9,14 +9,14 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
 
 class AnomalySeverity(str, Enum):
-    """Severity levels for anomalies."""
+    """Severity levels for anomalies, declared in ascending order (NONE=0 .. CRITICAL=4)."""
 
     NONE = "none"
     LOW = "low"
@@ -42,6 +42,20 @@ class BaselineStats(BaseModel):
     method: str
 
 
+class BaselineEstimate(NamedTuple):
+    """
+    Internal baseline snapshot returned by estimator peek() calls.
+
+    Same fields as BaselineStats without pydantic validation; peek() runs for
+    every (window, feature), and these values never cross the API boundary.
+    """
+
+    mean: float
+    std: float
+    count: int
+    method: str
+
+
 class FeatureAnomaly(BaseModel):
     """
     Anomaly result for a single feature within a window.
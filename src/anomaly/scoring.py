@@ -6,13 +6,22 @@ Maps deviations to severity levels with configurable thresholds.
 
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
 
 from src.core.config import AnomalyThresholds, ScoringConfig
 
 from .schema import AnomalySeverity
 
+# Severity -> rank from declaration order; overall_severity is a max over ranks.
+# The values stay strings because they are the API and prompt vocabulary.
+_SEVERITY_RANK = {severity: rank for rank, severity in enumerate(AnomalySeverity)}
+# Rank -> severity lookup table, shared by the scalar and batch paths.
+_SEVERITY_BY_RANK = tuple(AnomalySeverity)
+
 
 @dataclass
 class SeverityMapper:
@@ -22,33 +31,74 @@ class SeverityMapper:
 
     thresholds: AnomalyThresholds
 
+    def __post_init__(self) -> None:
+        # Bounds run low..critical, so the count reached is the rank NONE..CRITICAL.
+        self._z_bounds = (
+            self.thresholds.zscore_low,
+            self.thresholds.zscore_medium,
+            self.thresholds.zscore_high,
+            self.thresholds.zscore_critical,
+        )
+        self._rate_bounds = (
+            self.thresholds.rate_change_low,
+            self.thresholds.rate_change_medium,
+            self.thresholds.rate_change_high,
+            self.thresholds.rate_change_critical,
+        )
+        self._z_bins = np.array(self._z_bounds)
+        self._rate_bins = np.array(self._rate_bounds)
+
     def zscore_severity(self, zscore: Optional[float]) -> AnomalySeverity:
         if zscore is None:
             return AnomalySeverity.NONE
-        z = abs(zscore)
-        if z >= self.thresholds.zscore_critical:
-            return AnomalySeverity.CRITICAL
-        if z >= self.thresholds.zscore_high:
-            return AnomalySeverity.HIGH
-        if z >= self.thresholds.zscore_medium:
-            return AnomalySeverity.MEDIUM
-        if z >= self.thresholds.zscore_low:
-            return AnomalySeverity.LOW
-        return AnomalySeverity.NONE
+        return _SEVERITY_BY_RANK[_severity_rank(self._z_bounds, zscore)]
 
     def rate_change_severity(self, rate_change: Optional[float]) -> AnomalySeverity:
         if rate_change is None:
             return AnomalySeverity.NONE
-        r = abs(rate_change)
-        if r >= self.thresholds.rate_change_critical:
-            return AnomalySeverity.CRITICAL
-        if r >= self.thresholds.rate_change_high:
-            return AnomalySeverity.HIGH
-        if r >= self.thresholds.rate_change_medium:
-            return AnomalySeverity.MEDIUM
-        if r >= self.thresholds.rate_change_low:
-            return AnomalySeverity.LOW
-        return AnomalySeverity.NONE
+        return _SEVERITY_BY_RANK[_severity_rank(self._rate_bounds, rate_change)]
+
+    def zscore_rank(self, zscore: float) -> int:
+        """
+        Severity rank (0=NONE .. 4=CRITICAL) for one z-score; NaN is NONE.
+        """
+
+        return _severity_rank(self._z_bounds, zscore)
+
+    def rate_change_rank(self, rate_change: float) -> int:
+        """
+        Severity rank (0=NONE .. 4=CRITICAL) for one rate of change; NaN is NONE.
+        """
+
+        return _severity_rank(self._rate_bounds, rate_change)
+
+    def zscore_severities(self, zscores: np.ndarray) -> np.ndarray:
+        """
+        Severity ranks (0=NONE .. 4=CRITICAL) for an array of z-scores; NaN is NONE.
+        """
+
+        return _severity_ranks(self._z_bins, zscores)
+
+    def rate_change_severities(self, rate_changes: np.ndarray) -> np.ndarray:
+        """
+        Severity ranks (0=NONE .. 4=CRITICAL) for an array of rates; NaN is NONE.
+        """
+
+        return _severity_ranks(self._rate_bins, rate_changes)
+
+
+def _severity_rank(bounds: Tuple[float, float, float, float], value: float) -> int:
+    magnitude = abs(value)
+    if magnitude != magnitude:
+        return 0
+    return bisect_right(bounds, magnitude)
+
+
+def _severity_ranks(bins: np.ndarray, values: np.ndarray) -> np.ndarray:
+    magnitude = np.abs(values)
+    ranks = np.searchsorted(bins, magnitude, side="right").astype(np.int8)
+    ranks[np.isnan(magnitude)] = 0
+    return ranks
 
 
 def combine_scores(
@@ -76,18 +126,89 @@ def combine_scores(
     return min(max(score, 0.0), 1.0)
 
 
+class ScoreWeights(NamedTuple):
+    """
+    Plain-tuple snapshot of the config values combine_scores reads.
+
+    Built once by long-lived callers so the per-value path does indexed
+    tuple loads instead of walking the nested config models.
+    """
+
+    zscore_critical: float
+    rate_change_critical: float
+    zscore_weight: float
+    rate_change_weight: float
+
+    @classmethod
+    def from_config(cls, thresholds: AnomalyThresholds, scoring: ScoringConfig) -> "ScoreWeights":
+        return cls(
+            thresholds.zscore_critical,
+            thresholds.rate_change_critical,
+            scoring.zscore_weight,
+            scoring.rate_change_weight,
+        )
+
+    def combine(self, zscore: float, rate_change: float) -> float:
+        """
+        combine_scores with NaN standing in for None.
+        """
+
+        z_norm = 0.0
+        r_norm = 0.0
+        if zscore == zscore and self.zscore_critical > 0:
+            z_norm = min(abs(zscore) / self.zscore_critical, 1.0)
+        if rate_change == rate_change and self.rate_change_critical > 0:
+            r_norm = min(abs(rate_change) / self.rate_change_critical, 1.0)
+        return min(max((self.zscore_weight * z_norm) + (self.rate_change_weight * r_norm), 0.0), 1.0)
+
+
+def combine_scores_batch(
+    zscores: np.ndarray,
+    rate_changes: np.ndarray,
+    thresholds: AnomalyThresholds,
+    scoring: ScoringConfig,
+) -> np.ndarray:
+    """
+    Vectorized combine_scores over float arrays; NaN stands in for None.
+    """
+
+    z_norm = np.zeros(np.shape(zscores))
+    r_norm = np.zeros(np.shape(rate_changes))
+
+    if thresholds.zscore_critical > 0:
+        z_norm = np.nan_to_num(np.minimum(np.abs(zscores) / thresholds.zscore_critical, 1.0))
+
+    if thresholds.rate_change_critical > 0:
+        r_norm = np.nan_to_num(np.minimum(np.abs(rate_changes) / thresholds.rate_change_critical, 1.0))
+
+    score = (scoring.zscore_weight * z_norm) + (scoring.rate_change_weight * r_norm)
+    return np.clip(score, 0.0, 1.0)
+
+
+def mahalanobis_scores(
+    values: np.ndarray,
+    mean: np.ndarray,
+    inv_cov: np.ndarray,
+) -> np.ndarray:
+    """
+    Squared Mahalanobis distance (v - mu)^T S^-1 (v - mu) for each row of values.
+
+    values is (n, d), mean is (d,), and inv_cov is the (d, d) inverse covariance,
+    or its (d,) diagonal for independent features. All rows are scored in one
+    einsum (or, for a diagonal, one matrix-vector product) call.
+    """
+
+    deltas = np.asarray(values, dtype=np.float64) - np.asarray(mean, dtype=np.float64)
+    inv_cov = np.asarray(inv_cov, dtype=np.float64)
+    if inv_cov.ndim == 1:
+        return (deltas * deltas) @ inv_cov
+    return np.einsum("ni,ij,nj->n", deltas, inv_cov, deltas)
+
+
 def overall_severity(*severities: AnomalySeverity) -> AnomalySeverity:
     """
     Return the highest severity among inputs.
     """
 
-    order = [
-        AnomalySeverity.NONE,
-        AnomalySeverity.LOW,
-        AnomalySeverity.MEDIUM,
-        AnomalySeverity.HIGH,
-        AnomalySeverity.CRITICAL,
-    ]
-    highest_index = max(order.index(s) for s in severities)
-    return order[highest_index]
+    return max(severities, key=_SEVERITY_RANK.__getitem__)
 
@@ -2,7 +2,7 @@
 Core module: Configuration, logging, and exception handling.
 """
 
-from .config import Config, config
+from .config import Config, config, ensure_logs_dir
 from .exceptions import (
     AnomalyDetectionError,
     ModelInferenceError,
@@ -13,6 +13,7 @@ from .exceptions import (
 __all__ = [
     "Config",
     "config",
+    "ensure_logs_dir",
     "AnomalyDetectionError",
     "ModelInferenceError",
     "DataValidationError",
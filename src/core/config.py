@@ -8,7 +8,7 @@ thresholds are configurable to avoid hard-coded "magic numbers".
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -115,9 +115,24 @@ class Config(BaseSettings):
 	logs_dir: Path = Field(Path("logs"), description="Directory for log files")
 	anomaly: AnomalyConfig = AnomalyConfig()
 
-	def model_post_init(self, __context: object) -> None:
-		self.logs_dir.mkdir(parents=True, exist_ok=True)
-
 
 config = Config()
 
+# logs_dir already created by ensure_logs_dir in this process, if any.
+_ready_logs_dir: Optional[Path] = None
+
+
+def ensure_logs_dir() -> Path:
+	"""
+	Create config.logs_dir on first use and return it.
+
+	Kept out of Config itself so building a Config does no filesystem I/O;
+	later calls are free unless logs_dir has been repointed.
+	"""
+
+	global _ready_logs_dir
+	logs_dir = config.logs_dir
+	if logs_dir != _ready_logs_dir:
+		logs_dir.mkdir(parents=True, exist_ok=True)
+		_ready_logs_dir = logs_dir
+	return logs_dir
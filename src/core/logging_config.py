@@ -3,13 +3,24 @@ Logging configuration for production use.
 
 Provides structured logging with file and console output.
 Integrates with config for environment-specific log levels.
+
+Records are handed to a queue on the calling thread; a background
+QueueListener does the formatting and the console/file writes, so hot paths
+never block on disk I/O or log rotation.
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
+import threading
 from pathlib import Path
+from typing import Optional
+
+from .config import config, ensure_logs_dir
 
-from .config import config
+# Serializes the handler check-and-add in setup_logging
+_SETUP_LOCK = threading.Lock()
 
 
 def setup_logging(logger_name: str = "anomaly_copilot") -> logging.Logger:
@@ -24,10 +35,17 @@ def setup_logging(logger_name: str = "anomaly_copilot") -> logging.Logger:
     """
     logger = logging.getLogger(logger_name)
     
-    # Don't add handlers if logger already configured
-    if logger.handlers:
-        return logger
+    # Concurrent first calls must not each start a listener, which would
+    # write every record twice
+    with _SETUP_LOCK:
+        # Don't add handlers if logger already configured
+        if not logger.handlers:
+            _configure(logger, logger_name)
     
+    return logger
+
+
+def _configure(logger: logging.Logger, logger_name: str) -> None:
     logger.setLevel(config.log_level)
     
     # Formatter for consistent output
@@ -40,10 +58,9 @@ def setup_logging(logger_name: str = "anomaly_copilot") -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(config.log_level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # File handler (rotated daily)
-    log_file = config.logs_dir / f"{logger_name}.log"
+    log_file = ensure_logs_dir() / f"{logger_name}.log"
     file_handler = logging.handlers.RotatingFileHandler(
         log_file,
         maxBytes=10 * 1024 * 1024,  # 10MB
@@ -51,10 +68,41 @@ def setup_logging(logger_name: str = "anomaly_copilot") -> logging.Logger:
     )
     file_handler.setLevel(config.log_level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
     
-    return logger
+    # The logger only enqueues; the listener thread runs the real handlers
+    log_queue: queue.Queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True,
+    )
+    listener.start()
+    # Flush whatever is still queued on interpreter shutdown
+    atexit.register(listener.stop)
+
+
+class _LazyLogger:
+    """
+    Stand-in for the application logger that configures it on first use.
+    
+    Importing this module no longer opens the log file or starts the queue
+    listener; processes that never log (tests, worker pools) skip that work.
+    """
+    
+    def __init__(self, logger_name: str = "anomaly_copilot"):
+        self._logger_name = logger_name
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name: str):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._logger = setup_logging(self._logger_name)
+        return getattr(self._logger, name)
 
 
 # Application root logger
-logger = setup_logging()
+logger = _LazyLogger()
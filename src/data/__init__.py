@@ -20,6 +20,7 @@ for anomaly detection. Pipeline:
 """
 
 from src.data.aggregation import (
+    WindowIndex,
     aggregate_logs,
     align_timestamp_to_window,
     filter_windows_by_service,
@@ -89,6 +90,7 @@ __all__ = [
     "align_timestamp_to_window",
     "filter_windows_by_service",
     "filter_windows_by_time",
+    "WindowIndex",
     
     # Features
     "extract_features",
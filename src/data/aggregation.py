@@ -12,14 +12,29 @@ Design:
 - Windows preserve original log entries for inspection
 """
 
+import heapq
 import logging
+import sys
+from bisect import bisect_left
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List
+from itertools import islice
+from operator import attrgetter, le
+from typing import Dict, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
 
 from src.data.schema import AggregatedLogWindow, LogEntry
 
 logger = logging.getLogger(__name__)
 
+_MICROS = 1_000_000
+
+# (window_size_seconds, aligned_epoch, window_start) of the last alignment,
+# swapped as one tuple so concurrent callers never see a torn entry.
+_last_alignment: tuple = (None, None, None)
+
 
 class AggregationError(Exception):
     """Raised when aggregation fails."""
@@ -44,14 +59,25 @@ def align_timestamp_to_window(
     Returns:
         Aligned timestamp at window start (UTC)
     """
-    # Convert to epoch seconds
-    epoch_seconds = int(ts.replace(tzinfo=timezone.utc).timestamp())
+    global _last_alignment
+
+    # Convert to epoch seconds; already-UTC timestamps skip the replace() copy
+    if ts.tzinfo is not timezone.utc:
+        ts = ts.replace(tzinfo=timezone.utc)
+    epoch_seconds = int(ts.timestamp())
     
     # Align down to window boundary
     aligned_epoch = (epoch_seconds // window_size_seconds) * window_size_seconds
     
+    # Consecutive logs usually share a window; reuse its boundary datetime
+    last = _last_alignment
+    if last[0] == window_size_seconds and last[1] == aligned_epoch:
+        return last[2]
+    
     # Convert back to datetime
-    return datetime.fromtimestamp(aligned_epoch, tz=timezone.utc)
+    aligned = datetime.fromtimestamp(aligned_epoch, tz=timezone.utc)
+    _last_alignment = (window_size_seconds, aligned_epoch, aligned)
+    return aligned
 
 
 def aggregate_logs(
@@ -79,32 +105,100 @@ def aggregate_logs(
     if window_size_seconds <= 0:
         raise AggregationError("Window size must be positive")
     
+    if not logs:
+        return {}
+
+    timestamps = [log.timestamp for log in logs]
+    if not _utc_wall_clock(timestamps):
+        return _aggregate_logs_scalar(logs, timestamps, window_size_seconds)
+
+    # Align every timestamp with one vectorized integer op. int() in
+    # align_timestamp_to_window truncates toward zero, so do the same here.
+    micros = pd.to_datetime(timestamps, utc=True).as_unit("us").asi8
+    epoch = np.where(micros < 0, -(-micros // _MICROS), micros // _MICROS)
+    aligned = (epoch // window_size_seconds) * window_size_seconds
+
+    # Bucket ids in first-seen order of (window, service), matching the
+    # insertion order of the per-log loop.
+    service_codes, services = pd.factorize(np.array([log.service for log in logs], dtype=object))
+    bucket_ids, _ = pd.factorize(aligned * len(services) + service_codes)
+    first = np.unique(bucket_ids, return_index=True)[1]
+
+    # Pass 1: a stable sort by (bucket, timestamp) lays every bucket out
+    # contiguously and already in chronological order.
+    order = np.lexsort((micros, bucket_ids))
+    ordered = [logs[index] for index in order.tolist()]
+    ends = np.cumsum(np.bincount(bucket_ids)).tolist()
+
+    # Pass 2: build each window once, with its full log list.
+    step = timedelta(seconds=window_size_seconds)
+    starts: Dict[int, datetime] = {}
     windows: Dict[tuple, AggregatedLogWindow] = {}
-    
-    for log in logs:
-        # Align log timestamp to window
-        window_start = align_timestamp_to_window(log.timestamp, window_size_seconds)
-        window_end = window_start + timedelta(seconds=window_size_seconds)
-        
-        # Key for this window+service combo
-        key = (window_start, log.service)
-        
-        # Create window if it doesn't exist
-        if key not in windows:
-            windows[key] = AggregatedLogWindow(
-                window_start=window_start,
-                window_end=window_end,
-                window_size_seconds=window_size_seconds,
-                service=log.service,
-                logs=[]
-            )
+    begin = 0
+    for epoch_start, code, end in zip(aligned[first].tolist(), service_codes[first].tolist(), ends):
+        window_start = starts.get(epoch_start)
+        if window_start is None:
+            window_start = starts[epoch_start] = datetime.fromtimestamp(epoch_start, tz=timezone.utc)
+        service = sys.intern(services[code])
+        windows[(window_start, service)] = AggregatedLogWindow(
+            window_start=window_start,
+            window_end=window_start + step,
+            window_size_seconds=window_size_seconds,
+            service=service,
+            logs=ordered[begin:end],
+        )
+        begin = end
+
+    return windows
+
+
+def _utc_wall_clock(timestamps: List[datetime]) -> bool:
+    # align_timestamp_to_window replaces tzinfo rather than converting, which
+    # only agrees with a UTC conversion for naive or zero-offset timestamps.
+    for tzinfo in set(map(attrgetter("tzinfo"), timestamps)):
+        if tzinfo is not None and tzinfo.utcoffset(None) != timedelta(0):
+            return False
+    return True
+
+
+def _aggregate_logs_scalar(
+    logs: List[LogEntry],
+    timestamps: List[datetime],
+    window_size_seconds: int
+) -> Dict[tuple, AggregatedLogWindow]:
+    # Work on (aligned epoch, service) int/str keys; the datetime boundaries
+    # are only materialized once per window at the end.
+    grouped: Dict[tuple, List[LogEntry]] = {}
+    
+    for ts, log in zip(timestamps, logs):
+        # Align log timestamp to window, with align_timestamp_to_window's
+        # replace-not-convert semantics
+        epoch_seconds = int(ts.replace(tzinfo=timezone.utc).timestamp())
+        key = ((epoch_seconds // window_size_seconds) * window_size_seconds, sys.intern(log.service))
         
-        # Add log to window
-        windows[key].logs.append(log)
-    
-    # Sort logs within each window chronologically
-    for window in windows.values():
-        window.logs.sort(key=lambda l: l.timestamp)
+        bucket = grouped.get(key)
+        if bucket is None:
+            grouped[key] = [log]
+        else:
+            bucket.append(log)
+    
+    # Log streams usually arrive in order, and then every bucket already is;
+    # one linear check over the input replaces a sort per window.
+    if not all(map(le, timestamps, islice(timestamps, 1, None))):
+        for bucket in grouped.values():
+            bucket.sort(key=attrgetter("timestamp"))
+    
+    step = timedelta(seconds=window_size_seconds)
+    windows: Dict[tuple, AggregatedLogWindow] = {}
+    for (aligned_epoch, service), bucket in grouped.items():
+        window_start = datetime.fromtimestamp(aligned_epoch, tz=timezone.utc)
+        windows[(window_start, service)] = AggregatedLogWindow(
+            window_start=window_start,
+            window_end=window_start + step,
+            window_size_seconds=window_size_seconds,
+            service=service,
+            logs=bucket
+        )
     
     return windows
 
@@ -180,22 +274,16 @@ def print_windows_summary(
     if not windows:
         return "No windows"
     
-    total_logs = sum(len(w.logs) for w in windows.values())
-    services_dict: Dict[str, tuple] = {}  # service -> (window_count, log_count)
-    
+    window_counts = Counter(w.service for w in windows.values())
+    log_counts: Counter = Counter()
     for window in windows.values():
-        service = window.service
-        if service not in services_dict:
-            services_dict[service] = (0, 0)
-        
-        current_windows, current_logs = services_dict[service]
-        services_dict[service] = (current_windows + 1, current_logs + len(window.logs))
+        log_counts[window.service] += len(window.logs)
+    total_logs = sum(log_counts.values())
     
     lines = [f"Aggregated {total_logs} logs into {len(windows)} windows"]
     
-    for service in sorted(services_dict.keys()):
-        w_count, l_count = services_dict[service]
-        lines.append(f"  - {service}: {w_count} window(s) ({l_count} logs)")
+    for service in sorted(window_counts):
+        lines.append(f"  - {service}: {window_counts[service]} window(s) ({log_counts[service]} logs)")
     
     min_start, max_end = get_time_range(windows)
     if min_start and max_end:
@@ -224,7 +312,7 @@ def filter_windows_by_service(
 
 
 def filter_windows_by_time(
-    windows: Dict[tuple, AggregatedLogWindow],
+    windows: Union[Dict[tuple, AggregatedLogWindow], "WindowIndex"],
     start_time: datetime,
     end_time: datetime
 ) -> Dict[tuple, AggregatedLogWindow]:
@@ -232,19 +320,74 @@ def filter_windows_by_time(
     Filter windows to only those within a time range.
     
     Args:
-        windows: Dict of aggregated windows
+        windows: Dict of aggregated windows, or a WindowIndex over them
         start_time: Start of time range (inclusive)
         end_time: End of time range (exclusive)
     
     Returns:
         Filtered dict of windows
+    
+    Notes:
+        - A plain dict is scanned in full (O(K)); a WindowIndex answers
+          with a bisect (O(log K + M)), for repeated queries over many windows
     """
+    if isinstance(windows, WindowIndex):
+        return windows.between(start_time, end_time)
+    
     return {
         k: v for k, v in windows.items()
         if start_time <= v.window_start < end_time
     }
 
 
+class WindowIndex:
+    """
+    Time index over aggregated windows for repeated range queries.
+    
+    Built once from the dict returned by aggregate_logs; the dict itself is
+    left untouched and must not be mutated while the index is in use.
+    """
+    
+    def __init__(self, windows: Dict[tuple, AggregatedLogWindow]):
+        """
+        Initialize the index.
+        
+        Args:
+            windows: Dict of aggregated windows
+        """
+        self.windows = windows
+        
+        # window_start -> keys starting then, in the dict's insertion order
+        self.starts_to_keys: Dict[datetime, List[tuple]] = {}
+        for key, window in windows.items():
+            self.starts_to_keys.setdefault(window.window_start, []).append(key)
+        self.sorted_starts: List[datetime] = sorted(self.starts_to_keys)
+    
+    def between(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[tuple, AggregatedLogWindow]:
+        """
+        Windows with start_time <= window_start < end_time.
+        
+        Args:
+            start_time: Start of time range (inclusive)
+            end_time: End of time range (exclusive)
+        
+        Returns:
+            Dict of matching windows, in chronological order
+        """
+        lo = bisect_left(self.sorted_starts, start_time)
+        hi = bisect_left(self.sorted_starts, end_time, lo)
+        
+        return {
+            key: self.windows[key]
+            for window_start in self.sorted_starts[lo:hi]
+            for key in self.starts_to_keys[window_start]
+        }
+
+
 class WindowBatcher:
     """
     Helper for processing windows in batches.
@@ -263,6 +406,30 @@ class WindowBatcher:
         self.logs = logs
         self.window_size_seconds = window_size_seconds
     
+    @classmethod
+    def from_streams(
+        cls,
+        streams: List[Iterable[LogEntry]],
+        window_size_seconds: int = 300
+    ) -> "WindowBatcher":
+        """
+        Initialize from several log streams, each already in time order.
+        
+        The streams are k-way merged with heapq.merge (O(N log k)) instead of
+        concatenated and re-sorted. The merged logs are chronological, so
+        aggregate_logs skips its per-window sorts and windows come out in
+        window_start order.
+        
+        Args:
+            streams: Iterables of logs, each sorted by timestamp
+            window_size_seconds: Window size
+        
+        Returns:
+            WindowBatcher over the merged logs
+        """
+        merged = list(heapq.merge(*streams, key=attrgetter("timestamp")))
+        return cls(merged, window_size_seconds)
+    
     def process(self) -> List[AggregatedLogWindow]:
         """
         Process all logs into windows.
@@ -293,9 +460,10 @@ class WindowBatcher:
         # Group by window time
         by_time: Dict[datetime, List[AggregatedLogWindow]] = {}
         for window in windows_dict.values():
-            if window.window_start not in by_time:
-                by_time[window.window_start] = []
-            by_time[window.window_start].append(window)
+            bucket = by_time.get(window.window_start)
+            if bucket is None:
+                bucket = by_time[window.window_start] = []
+            bucket.append(window)
         
         # Sort each time's windows by service
         for time_key in by_time:
@@ -13,45 +13,105 @@ Design:
 """
 
 import logging
-import statistics
-from typing import Dict, List, Optional
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from src.data.schema import AggregatedLogWindow, FeatureVector, LogLevel
 
 logger = logging.getLogger(__name__)
 
+# Levels counted as errors, built once rather than per log
+_ERROR_LEVELS = frozenset({LogLevel.ERROR, LogLevel.CRITICAL})
+
 
 class FeatureExtractionError(Exception):
     """Raised when feature extraction fails."""
     pass
 
 
-def extract_count_features(window: AggregatedLogWindow) -> Dict[str, int]:
+@dataclass(frozen=True)
+class WindowColumns:
     """
-    Extract count-based features from logs.
+    Column-major (structure-of-arrays) view of a window's logs.
+    
+    Attributes:
+        total: Number of logs
+        level_counts: Number of logs per LogLevel
+        durations: int64 duration_ms of the logs that have one
+        message_hashes: Non-empty metadata message_hash values
+        error_codes: Non-empty error_code values
+    """
+    total: int
+    level_counts: Counter
+    durations: np.ndarray
+    message_hashes: List[str]
+    error_codes: List[str]
+    
+    def level_count(self, *levels: LogLevel) -> int:
+        """Number of logs at any of the given levels."""
+        return sum(self.level_counts[level] for level in levels)
+
+
+def window_columns(window: AggregatedLogWindow) -> WindowColumns:
+    """
+    Build the columnar view of a window's logs in a single pass.
+    
+    extract_features builds it once and hands it to every feature group.
     
     Args:
         window: AggregatedLogWindow to process
     
     Returns:
-        Dict with keys: total_events, error_count, warning_count, info_count
+        WindowColumns for the window's logs
     """
-    total = len(window.logs)
-    
-    error_count = sum(
-        1 for log in window.logs
-        if log.level in [LogLevel.ERROR, LogLevel.CRITICAL]
+    logs = window.logs
+    levels = []
+    durations = []
+    message_hashes = []
+    error_codes = []
+    for log in logs:
+        levels.append(log.level)
+        if log.duration_ms is not None:
+            durations.append(log.duration_ms)
+        msg_hash = log.metadata.get("message_hash")
+        if msg_hash:
+            message_hashes.append(msg_hash)
+        if log.error_code:
+            error_codes.append(log.error_code)
+    
+    return WindowColumns(
+        total=len(levels),
+        level_counts=Counter(levels),
+        durations=np.array(durations, dtype=np.int64),
+        message_hashes=message_hashes,
+        error_codes=error_codes,
     )
+
+
+def extract_count_features(
+    window: AggregatedLogWindow,
+    columns: Optional[WindowColumns] = None
+) -> Dict[str, int]:
+    """
+    Extract count-based features from logs.
     
-    warning_count = sum(
-        1 for log in window.logs
-        if log.level == LogLevel.WARNING
-    )
+    Args:
+        window: AggregatedLogWindow to process
+        columns: Prebuilt window_columns(window), if the caller has one
     
-    info_count = sum(
-        1 for log in window.logs
-        if log.level == LogLevel.INFO
-    )
+    Returns:
+        Dict with keys: total_events, error_count, warning_count, info_count
+    """
+    if columns is None:
+        columns = window_columns(window)
+    total = columns.total
+    
+    error_count = columns.level_count(*_ERROR_LEVELS)
+    warning_count = columns.level_count(LogLevel.WARNING)
+    info_count = columns.level_count(LogLevel.INFO)
     
     return {
         "total_events": total,
@@ -61,12 +121,16 @@ def extract_count_features(window: AggregatedLogWindow) -> Dict[str, int]:
     }
 
 
-def extract_rate_features(window: AggregatedLogWindow) -> Dict[str, float]:
+def extract_rate_features(
+    window: AggregatedLogWindow,
+    columns: Optional[WindowColumns] = None
+) -> Dict[str, float]:
     """
     Extract rate-based features (fractions).
     
     Args:
         window: AggregatedLogWindow to process
+        columns: Prebuilt window_columns(window), if the caller has one
     
     Returns:
         Dict with keys: error_rate, warning_rate
@@ -75,7 +139,15 @@ def extract_rate_features(window: AggregatedLogWindow) -> Dict[str, float]:
         - Rates are in [0.0, 1.0]
         - If total_events is 0, rates are 0.0
     """
-    total = len(window.logs)
+    if columns is None:
+        columns = window_columns(window)
+    
+    return _rates_from_counts(extract_count_features(window, columns))
+
+
+def _rates_from_counts(counts: Dict[str, int]) -> Dict[str, float]:
+    """Derive the rate features from extract_count_features output."""
+    total = counts["total_events"]
     
     if total == 0:
         return {
@@ -83,28 +155,22 @@ def extract_rate_features(window: AggregatedLogWindow) -> Dict[str, float]:
             "warning_rate": 0.0,
         }
     
-    error_count = sum(
-        1 for log in window.logs
-        if log.level in [LogLevel.ERROR, LogLevel.CRITICAL]
-    )
-    
-    warning_count = sum(
-        1 for log in window.logs
-        if log.level == LogLevel.WARNING
-    )
-    
     return {
-        "error_rate": error_count / total,
-        "warning_rate": warning_count / total,
+        "error_rate": counts["error_count"] / total,
+        "warning_rate": counts["warning_count"] / total,
     }
 
 
-def extract_duration_features(window: AggregatedLogWindow) -> Dict[str, Optional[float]]:
+def extract_duration_features(
+    window: AggregatedLogWindow,
+    columns: Optional[WindowColumns] = None
+) -> Dict[str, Optional[float]]:
     """
     Extract duration-based features (latency statistics).
     
     Args:
         window: AggregatedLogWindow to process
+        columns: Prebuilt window_columns(window), if the caller has one
     
     Returns:
         Dict with keys: median_duration_ms, p95_duration_ms, max_duration_ms
@@ -114,30 +180,35 @@ def extract_duration_features(window: AggregatedLogWindow) -> Dict[str, Optional
         - If no durations, all values are None
         - Statistics are computed from raw durations (no normalization)
     """
-    durations = [
-        log.duration_ms for log in window.logs
-        if log.duration_ms is not None
-    ]
+    if columns is None:
+        columns = window_columns(window)
+    durations = columns.durations
     
-    if not durations:
+    if not durations.size:
         return {
             "median_duration_ms": None,
             "p95_duration_ms": None,
             "max_duration_ms": None,
         }
     
-    # Sort for percentile calculation
-    sorted_durations = sorted(durations)
+    count = len(durations)
+    mid = count // 2
+    p95_index = min(int(0.95 * count), count - 1)
     
-    # Median
-    median = statistics.median(sorted_durations)
+    # Max is a plain reduction; the remaining order statistics (median, p95)
+    # come from one introselect that only places those pivots
+    max_duration = int(durations.max())
+    kth = sorted({mid - 1 if count % 2 == 0 else mid, mid, p95_index})
+    ranked = np.partition(durations, kth)
     
-    # 95th percentile
-    p95_index = int(0.95 * len(sorted_durations))
-    p95 = sorted_durations[min(p95_index, len(sorted_durations) - 1)]
+    # Median (same int/float result as statistics.median)
+    if count % 2:
+        median = int(ranked[mid])
+    else:
+        median = (int(ranked[mid - 1]) + int(ranked[mid])) / 2
     
-    # Max
-    max_duration = max(sorted_durations)
+    # 95th percentile
+    p95 = int(ranked[p95_index])
     
     return {
         "median_duration_ms": median,
@@ -146,12 +217,16 @@ def extract_duration_features(window: AggregatedLogWindow) -> Dict[str, Optional
     }
 
 
-def extract_diversity_features(window: AggregatedLogWindow) -> Dict[str, int]:
+def extract_diversity_features(
+    window: AggregatedLogWindow,
+    columns: Optional[WindowColumns] = None
+) -> Dict[str, int]:
     """
     Extract diversity-based features (uniqueness).
     
     Args:
         window: AggregatedLogWindow to process
+        columns: Prebuilt window_columns(window), if the caller has one
     
     Returns:
         Dict with keys: unique_messages, unique_error_codes
@@ -160,22 +235,14 @@ def extract_diversity_features(window: AggregatedLogWindow) -> Dict[str, int]:
         - Uses message_hash from metadata for deduplication
         - Error codes are checked even if None
     """
-    # Count unique messages (by hash)
-    message_hashes = set()
-    for log in window.logs:
-        msg_hash = log.metadata.get("message_hash")
-        if msg_hash:
-            message_hashes.add(msg_hash)
+    if columns is None:
+        columns = window_columns(window)
     
-    unique_messages = len(message_hashes)
+    # Count unique messages (by hash)
+    unique_messages = len(set(columns.message_hashes))
     
     # Count unique error codes
-    error_codes = set()
-    for log in window.logs:
-        if log.error_code:
-            error_codes.add(log.error_code)
-    
-    unique_error_codes = len(error_codes)
+    unique_error_codes = len(set(columns.error_codes))
     
     return {
         "unique_messages": unique_messages,
@@ -201,10 +268,11 @@ def extract_features(window: AggregatedLogWindow) -> FeatureVector:
     """
     try:
         # Extract all feature groups
-        count_feats = extract_count_features(window)
-        rate_feats = extract_rate_features(window)
-        duration_feats = extract_duration_features(window)
-        diversity_feats = extract_diversity_features(window)
+        columns = window_columns(window)
+        count_feats = extract_count_features(window, columns)
+        rate_feats = _rates_from_counts(count_feats)
+        duration_feats = extract_duration_features(window, columns)
+        diversity_feats = extract_diversity_features(window, columns)
         
         # Combine into metadata for debugging
         metadata = {
@@ -285,6 +353,31 @@ class FeatureTransformer:
             features: List of FeatureVector objects (typically for one service)
         """
         self.features = features
+        # Per-feature (values, indices) columns, filled lazily by _column
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def _column(self, feature_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Non-None values of one feature as a float64 array.
+        
+        Returned with the position of each value in self.features, since
+        vectors where the feature is None are skipped. Built once per feature
+        name, so a baseline computed from the same transformer reuses it.
+        Treats self.features as read-only.
+        """
+        column = self._columns.get(feature_name)
+        if column is None:
+            raw = [getattr(fv, feature_name, None) for fv in self.features]
+            values = np.fromiter(
+                (v for v in raw if v is not None), dtype=np.float64
+            )
+            indices = np.fromiter(
+                (idx for idx, v in enumerate(raw) if v is not None),
+                dtype=np.intp,
+                count=values.size,
+            )
+            column = self._columns[feature_name] = (values, indices)
+        return column
     
     def get_statistics(self, feature_name: str) -> Dict[str, float]:
         """
@@ -299,24 +392,17 @@ class FeatureTransformer:
         Raises:
             ValueError: If feature not found or no data
         """
-        values = []
+        values, _ = self._column(feature_name)
         
-        for fv in self.features:
-            value = getattr(fv, feature_name, None)
-            if value is not None:
-                values.append(float(value))
-        
-        if not values:
+        if not values.size:
             raise ValueError(f"No data for feature: {feature_name}")
         
-        sorted_vals = sorted(values)
-        
         return {
-            "min": min(values),
-            "max": max(values),
-            "mean": sum(values) / len(values),
-            "median": statistics.median(sorted_vals),
-            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "stdev": float(values.std(ddof=1)) if values.size > 1 else 0.0,
         }
     
     def compare_to_baseline(
@@ -341,10 +427,6 @@ class FeatureTransformer:
         baseline_mean = baseline_stats["mean"]
         threshold = baseline_mean * multiplier
         
-        anomalies = []
-        for idx, fv in enumerate(self.features):
-            value = getattr(fv, feature_name, None)
-            if value is not None and value > threshold:
-                anomalies.append(idx)
+        values, indices = self._column(feature_name)
         
-        return anomalies
+        return indices[values > threshold].tolist()
@@ -18,7 +18,7 @@ import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterator, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +107,29 @@ class TextLogSource(BaseLogSource):
         except Exception as e:
             logger.error(f"Error reading text log file {self.filepath}: {e}")
             raise LogIngestionError(f"Failed to read text log: {e}") from e
+    
+    def ingest_bulk(self) -> List[str]:
+        """
+        Read the whole text log file in one call.
+        
+        Returns:
+            Stripped, non-empty log lines in file order
+        
+        Notes:
+            - Same lines as ingest(), without the per-line generator step and
+              raw_line/_metadata dicts; for batch callers that only need text.
+              Every line shares this source's filepath and "text" format.
+            - Splits on "\n" after universal-newline decoding, exactly like
+              iterating the file object (str.splitlines would also split on
+              form feeds and other separators)
+        """
+        try:
+            text = self.filepath.read_text(encoding=self.encoding)
+        except Exception as e:
+            logger.error(f"Error reading text log file {self.filepath}: {e}")
+            raise LogIngestionError(f"Failed to read text log: {e}") from e
+        
+        return [line for line in map(str.strip, text.split("\n")) if line]
 
 
 class JSONLogSource(BaseLogSource):
@@ -14,7 +14,10 @@ Design:
 
 import hashlib
 import logging
+import re
+import sys
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 from src.data.schema import LogEntry, LogLevel
@@ -27,6 +30,70 @@ class NormalizationError(Exception):
     pass
 
 
+# Epoch seconds/millis, checked before any parsing so ISO strings never pay
+# for a failed float() call.
+_EPOCH_RE = re.compile(r"^-?\d+(\.\d+)?$")
+
+# Zero-padded forms of the supported date-time formats, which fromisoformat
+# parses to the same value strptime would.
+_ISO_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2}(\.\d{1,6})?Z?| \d{2}:\d{2}:\d{2})",
+    re.ASCII,
+)
+
+# strptime fallbacks for strings fromisoformat rejects (e.g. unpadded fields),
+# most common shapes first.
+_TIMESTAMP_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+)
+
+
+def _from_epoch(ts_float: float) -> datetime:
+    # Detect seconds vs milliseconds
+    # Timestamps before year 3000 are seconds
+    if ts_float < 32503680000:  # Year 3000 in seconds
+        return datetime.fromtimestamp(ts_float, tz=timezone.utc)
+    return datetime.fromtimestamp(ts_float / 1000, tz=timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(ts_str: str) -> Optional[datetime]:
+    """Parse a stripped timestamp string; None if no format matches.
+
+    Cached because bursty logs repeat the same second many times over.
+    """
+    if _EPOCH_RE.match(ts_str):
+        try:
+            return _from_epoch(float(ts_str))
+        except ValueError:
+            return None
+
+    if _ISO_RE.fullmatch(ts_str):
+        try:
+            return datetime.fromisoformat(ts_str.removesuffix("Z")).replace(
+                tzinfo=timezone.utc
+            )
+        except ValueError:
+            # Out-of-range fields, or fraction widths Python 3.10 rejects
+            pass
+
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(ts_str, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+
+    # Other float spellings ("1e9", "+1707315045") are still epoch values
+    try:
+        return _from_epoch(float(ts_str))
+    except ValueError:
+        return None
+
+
 def normalize_timestamp(ts_str: str) -> datetime:
     """
     Normalize timestamp string to UTC datetime.
@@ -52,39 +119,10 @@ def normalize_timestamp(ts_str: str) -> datetime:
     
     ts_str = str(ts_str).strip()
     
-    # Try numeric (epoch seconds or millis)
-    try:
-        ts_float = float(ts_str)
-        
-        # Detect seconds vs milliseconds
-        # Timestamps before year 3000 are seconds
-        if ts_float < 32503680000:  # Year 3000 in seconds
-            return datetime.fromtimestamp(ts_float, tz=timezone.utc)
-        else:
-            return datetime.fromtimestamp(ts_float / 1000, tz=timezone.utc)
-    except ValueError:
-        pass
-    
-    # Try ISO 8601 formats
-    iso_formats = [
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%dT%H:%M:%S.%f",
-    ]
-    
-    for fmt in iso_formats:
-        try:
-            dt = datetime.strptime(ts_str, fmt)
-            # Make timezone-aware (UTC)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-        except ValueError:
-            continue
-    
-    raise NormalizationError(f"Could not parse timestamp: {ts_str}")
+    dt = _parse_timestamp(ts_str)
+    if dt is None:
+        raise NormalizationError(f"Could not parse timestamp: {ts_str}")
+    return dt
 
 
 def normalize_level(level_str: str) -> LogLevel:
@@ -137,6 +175,7 @@ def normalize_service(service_str: str) -> str:
     - Strip whitespace
     - Allow alphanumeric, dashes, underscores
     - Max 128 characters
+    - Interned, so repeated names share one string object
     
     Args:
         service_str: Service name
@@ -166,7 +205,8 @@ def normalize_service(service_str: str) -> str:
     if not service:
         raise NormalizationError("Service name empty after normalization")
     
-    return service
+    # Interned: the same few names repeat across every log and window key
+    return sys.intern(service)
 
 
 def normalize_message(message_str: str) -> tuple[str, str]:
@@ -199,8 +239,9 @@ def normalize_message(message_str: str) -> tuple[str, str]:
     if len(message) > 2048:
         message = message[:2048]
     
-    # Compute hash for deduplication
-    msg_hash = hashlib.sha256(message.encode()).hexdigest()[:16]
+    # Compute hash for deduplication (64-bit BLAKE2b: same 16 hex chars as
+    # the old truncated SHA-256, with far less work per message)
+    msg_hash = hashlib.blake2b(message.encode(), digest_size=8).hexdigest()
     
     return message, msg_hash
 
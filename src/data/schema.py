@@ -12,9 +12,10 @@ Design rationale:
 - Extensible metadata dict for additional context
 """
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -112,7 +113,8 @@ class LogEntry(BaseModel):
         }
 
 
-class AggregatedLogWindow(BaseModel):
+@dataclass(slots=True)
+class AggregatedLogWindow:
     """
     Aggregated logs within a fixed time window.
     
@@ -130,40 +132,21 @@ class AggregatedLogWindow(BaseModel):
         - window_end is exclusive (typical for time ranges)
         - Logs within a window are in chronological order
         - Useful for debugging / understanding feature values
+        - A slotted dataclass rather than a pydantic model: windows are only
+          built internally from already-validated LogEntry objects, and there
+          can be one per service per window, so per-instance validation and
+          __dict__ were pure overhead. Fields are not type-coerced.
     """
     
-    window_start: datetime = Field(
-        ...,
-        description="UTC start of time window"
-    )
-    
-    window_end: datetime = Field(
-        ...,
-        description="UTC end of time window (exclusive)"
-    )
-    
-    window_size_seconds: int = Field(
-        ...,
-        ge=1,
-        description="Duration of the window in seconds"
-    )
+    window_start: datetime
+    window_end: datetime
+    window_size_seconds: int
+    service: str
+    logs: List[LogEntry] = field(default_factory=list)
     
-    service: str = Field(
-        ...,
-        description="Service name"
-    )
-    
-    logs: list[LogEntry] = Field(
-        default_factory=list,
-        description="Logs in this window for this service"
-    )
-    
-    class Config:
-        """Pydantic model configuration."""
-        arbitrary_types_allowed = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
+    def __post_init__(self) -> None:
+        if self.window_size_seconds < 1:
+            raise ValueError("window_size_seconds must be >= 1")
     
     @property
     def log_count(self) -> int:
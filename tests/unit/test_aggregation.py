@@ -15,6 +15,8 @@ from src.data.aggregation import (
     get_time_range,
     filter_windows_by_service,
     filter_windows_by_time,
+    WindowBatcher,
+    WindowIndex,
 )
 
 
@@ -179,6 +181,39 @@ class TestAgregateLogs:
         assert window.logs[1].message == "Request 2"
         assert window.logs[2].message == "Request 3"
 
+    def test_aggregate_matches_per_log_alignment(self):
+        """Test that windows match align_timestamp_to_window in first-seen order."""
+        ts_base = datetime(2025, 2, 7, 10, 30, 0, tzinfo=timezone.utc)
+        services = ["db", "api", "auth"]
+
+        logs = [
+            LogEntry(
+                timestamp=ts_base + timedelta(seconds=(i * 97) % 1800, microseconds=i),
+                level=LogLevel.INFO,
+                service=services[i % 3],
+                message=f"Request {i}"
+            )
+            for i in range(60)
+        ]
+
+        windows = aggregate_logs(logs, window_size_seconds=300)
+
+        expected_keys = []
+        for log in logs:
+            key = (align_timestamp_to_window(log.timestamp, 300), log.service)
+            if key not in expected_keys:
+                expected_keys.append(key)
+        assert list(windows.keys()) == expected_keys
+
+        for (window_start, service), window in windows.items():
+            expected = sorted(
+                (l for l in logs
+                 if l.service == service
+                 and align_timestamp_to_window(l.timestamp, 300) == window_start),
+                key=lambda l: l.timestamp,
+            )
+            assert window.logs == expected
+
 
 class TestWindowFiltering:
     """Test filtering of aggregated windows."""
@@ -225,6 +260,19 @@ class TestWindowFiltering:
         
         # Should get the first window (10:30-10:35)
         assert len(filtered) == 1
+    
+    def test_filter_by_time_with_index(self):
+        """Test that a WindowIndex gives the same windows as a full scan."""
+        index = WindowIndex(self.windows)
+        ts_base = datetime(2025, 2, 7, 10, 25, 0, tzinfo=timezone.utc)
+        
+        for start_minutes in range(0, 25, 5):
+            for end_minutes in range(start_minutes, 30, 5):
+                ts_start = ts_base + timedelta(minutes=start_minutes)
+                ts_end = ts_base + timedelta(minutes=end_minutes)
+                
+                assert filter_windows_by_time(index, ts_start, ts_end) == \
+                    filter_windows_by_time(self.windows, ts_start, ts_end)
 
 
 class TestWindowAnalytics:
@@ -279,3 +327,36 @@ class TestWindowAnalytics:
         
         assert min_time is None
         assert max_time is None
+
+
+class TestWindowBatcher:
+    """Test batch processing of windows."""
+    
+    def test_from_streams_merges_sorted_streams(self):
+        """Test that pre-sorted streams are merged chronologically."""
+        ts_base = datetime(2025, 2, 7, 10, 30, 0, tzinfo=timezone.utc)
+        streams = [
+            [
+                LogEntry(
+                    timestamp=ts_base + timedelta(seconds=offset),
+                    level=LogLevel.INFO,
+                    service=service,
+                    message=f"{service} {offset}"
+                )
+                for offset in range(start, 900, 120)
+            ]
+            for start, service in ((0, "api-server"), (45, "database"), (90, "api-server"))
+        ]
+        
+        batcher = WindowBatcher.from_streams(streams, window_size_seconds=300)
+        
+        timestamps = [log.timestamp for log in batcher.logs]
+        assert timestamps == sorted(timestamps)
+        assert len(batcher.logs) == sum(len(stream) for stream in streams)
+        
+        windows = batcher.process()
+        assert [(w.window_start, w.service) for w in windows] == sorted(
+            (w.window_start, w.service) for w in windows
+        )
+        for window in windows:
+            assert window.logs == sorted(window.logs, key=lambda l: l.timestamp)
@@ -26,6 +26,20 @@ def test_rolling_stats_warmup_and_values():
     assert stats.std > 0.0
 
 
+def test_rolling_stats_track_window_after_eviction():
+    estimator = RollingStatsEstimator(window_size=3, min_points=1, std_floor=0.0)
+    values = [5.0, 1000.0, 7.0, 6.0, 8.0, 6.5, 7.5]
+
+    for i, value in enumerate(values):
+        estimator.update(value)
+        window = values[max(0, i - 2) : i + 1]
+        mean = sum(window) / len(window)
+        std = (sum((v - mean) ** 2 for v in window) / len(window)) ** 0.5
+        stats = estimator.peek()
+        assert isclose(stats.mean, mean, rel_tol=1e-9)
+        assert isclose(stats.std, std, rel_tol=1e-6, abs_tol=1e-9)
+
+
 def test_ewma_stats_warmup_and_monotonic_mean():
     estimator = EWMABaselineEstimator(alpha=0.5, min_points=3, std_floor=1e-6)
 
@@ -40,3 +54,26 @@ def test_ewma_stats_warmup_and_monotonic_mean():
     assert stats.mean <= 30.0
     assert stats.std >= 0.0
 
+
+
+def test_seeded_estimators_match_updated_ones():
+    values = [5.0, 1000.0, 7.0, 6.0, 8.0]
+    rolling = RollingStatsEstimator(window_size=3, min_points=1, std_floor=0.0)
+    ewma = EWMABaselineEstimator(alpha=0.3, min_points=1, std_floor=0.0)
+    for value in values:
+        rolling.update(value)
+        ewma.update(value)
+
+    seeded_rolling = RollingStatsEstimator(window_size=3, min_points=1, std_floor=0.0)
+    seeded_rolling.seed(values)
+    seeded_ewma = EWMABaselineEstimator(alpha=0.3, min_points=1, std_floor=0.0)
+    expected = ewma.peek()
+    seeded_ewma.seed(expected.mean, expected.std ** 2, len(values), values[-1])
+
+    assert isclose(seeded_rolling.peek().mean, rolling.peek().mean, rel_tol=1e-9)
+    assert isclose(seeded_rolling.peek().std, rolling.peek().std, rel_tol=1e-6)
+    assert seeded_rolling.last_value == rolling.last_value
+    assert seeded_ewma.peek().mean == expected.mean
+    assert isclose(seeded_ewma.peek().std, expected.std, rel_tol=1e-9)
+    assert seeded_ewma.peek().count == expected.count
+    assert seeded_ewma.last_value == ewma.last_value
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 
 from src.anomaly.engine import AnomalyEngine
 from src.anomaly.schema import AnomalySeverity
+from src.anomaly.scoring import overall_severity
 from src.data.schema import FeatureVector
 
 
@@ -52,6 +53,45 @@ def test_engine_warmup_and_detection():
     assert any(a.feature == "error_rate" for a in event.anomalies)
 
 
+def test_engine_fresh_restarts_warmup():
+    engine = AnomalyEngine()
+    service = "api"
+    t0 = datetime(2025, 2, 7, 10, 0, tzinfo=timezone.utc)
+
+    engine.detect([_make_feature_vector(t0, service) for _ in range(10)])
+    fresh = engine.fresh()
+
+    spike = _make_feature_vector(t0, service, error_rate=0.5, error_count=50)
+    assert fresh.detect([spike]) == []
+    assert fresh._severity_mapper is engine._severity_mapper
+    assert engine.detect([spike]) != []
+
+
+def test_detect_batch_matches_streaming_detect():
+    t0 = datetime(2025, 2, 7, 10, 0, tzinfo=timezone.utc)
+    features = []
+    for i in range(30):
+        for service in ("api", "auth"):
+            overrides = {"error_rate": 0.01 + 0.001 * (i % 3)}
+            if i == 20 and service == "api":
+                overrides = {"error_rate": 0.5, "error_count": 50}
+            if i == 25 and service == "auth":
+                overrides = {"p95_duration_ms": 2000.0, "median_duration_ms": None}
+            features.append(_make_feature_vector(t0, service, **overrides))
+
+    streamed = AnomalyEngine().detect(features)
+    batched = AnomalyEngine().detect_batch(features)
+
+    def summary(events):
+        return [
+            (e.service, e.severity, [(a.feature, a.severity, round(a.score, 9)) for a in e.anomalies])
+            for e in events
+        ]
+
+    assert streamed
+    assert summary(batched) == summary(streamed)
+
+
 def test_engine_redundancy_suppression():
     engine = AnomalyEngine()
     service = "auth"
@@ -74,3 +114,8 @@ def test_engine_redundancy_suppression():
     # Suppression should keep only the top rate anomaly
     assert len(rate_anomalies) == 1
 
+
+
+def test_overall_severity_returns_highest():
+    assert overall_severity(AnomalySeverity.LOW, AnomalySeverity.CRITICAL, AnomalySeverity.MEDIUM) == AnomalySeverity.CRITICAL
+    assert overall_severity(AnomalySeverity.NONE) == AnomalySeverity.NONE
@@ -0,0 +1,79 @@
+"""
+Unit tests for anomaly scoring.
+"""
+
+import math
+
+import numpy as np
+
+from src.anomaly.schema import AnomalySeverity
+from src.anomaly.scoring import (
+    ScoreWeights,
+    SeverityMapper,
+    combine_scores,
+    combine_scores_batch,
+    mahalanobis_scores,
+)
+from src.core.config import config
+
+
+def test_combine_scores_batch_matches_scalar():
+    thresholds = config.anomaly.thresholds
+    scoring = config.anomaly.scoring
+    zscores = [None, 0.0, 1.5, -3.2, 12.0, None, 4.0]
+    rate_changes = [None, 0.1, None, 0.8, 5.0, 2.5, -1.0]
+
+    batch = combine_scores_batch(
+        np.array([math.nan if z is None else z for z in zscores]),
+        np.array([math.nan if r is None else r for r in rate_changes]),
+        thresholds,
+        scoring,
+    )
+
+    for i, (z, r) in enumerate(zip(zscores, rate_changes)):
+        assert abs(batch[i] - combine_scores(z, r, thresholds, scoring)) < 1e-12
+
+
+def test_severity_mapper_batch_ranks_match_scalar():
+    mapper = SeverityMapper(config.anomaly.thresholds)
+    zscores = [None, 0.0, -2.5, 3.0, 4.1, 6.0, -100.0]
+    rate_changes = [None, 0.05, 0.5, 1.0, 2.0, 3.5, 50.0]
+    ranks = {severity: rank for rank, severity in enumerate(
+        [AnomalySeverity.NONE, AnomalySeverity.LOW, AnomalySeverity.MEDIUM,
+         AnomalySeverity.HIGH, AnomalySeverity.CRITICAL]
+    )}
+
+    z_ranks = mapper.zscore_severities(np.array([math.nan if z is None else z for z in zscores]))
+    r_ranks = mapper.rate_change_severities(np.array([math.nan if r is None else r for r in rate_changes]))
+
+    assert z_ranks.dtype == np.int8
+    assert [int(rank) for rank in z_ranks] == [ranks[mapper.zscore_severity(z)] for z in zscores]
+    assert [int(rank) for rank in r_ranks] == [ranks[mapper.rate_change_severity(r)] for r in rate_changes]
+
+
+def test_score_weights_combine_matches_scalar():
+    thresholds = config.anomaly.thresholds
+    scoring = config.anomaly.scoring
+    weights = ScoreWeights.from_config(thresholds, scoring)
+
+    for z, r in [(None, None), (1.5, None), (None, 0.8), (-3.2, 0.8), (12.0, 5.0)]:
+        combined = weights.combine(math.nan if z is None else z, math.nan if r is None else r)
+        assert combined == combine_scores(z, r, thresholds, scoring)
+
+
+def test_mahalanobis_scores_full_and_diagonal():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(50, 3))
+    mean = values.mean(axis=0)
+    inv_cov = np.linalg.inv(np.cov(values, rowvar=False))
+
+    scores = mahalanobis_scores(values, mean, inv_cov)
+    for row, score in zip(values, scores):
+        delta = row - mean
+        assert abs(score - delta @ inv_cov @ delta) < 1e-9
+
+    diagonal = np.array([0.5, 2.0, 4.0])
+    assert np.allclose(
+        mahalanobis_scores(values, mean, diagonal),
+        mahalanobis_scores(values, mean, np.diag(diagonal)),
+    )
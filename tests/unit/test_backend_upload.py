@@ -0,0 +1,75 @@
+"""
+Unit tests for upload handling in the backend server.
+"""
+
+import io
+
+import backend.main as backend_main
+from backend.main import UploadStore, _stream_multipart_file
+
+
+def _multipart(boundary: str, parts) -> bytes:
+    body = b""
+    for headers, content in parts:
+        body += f"--{boundary}\r\n{headers}\r\n\r\n".encode() + content + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode()
+
+
+def test_streams_file_field_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend_main, "UPLOAD_CHUNK_SIZE", 7)
+    boundary = "XyZ123"
+    content = b"line one\r\nline two --XyZ12 not a boundary\r\n" * 50
+    body = _multipart(
+        boundary,
+        [
+            ('Content-Disposition: form-data; name="note"', b"ignored"),
+            ('Content-Disposition: form-data; name="file"; filename="app.log"', content),
+        ],
+    )
+
+    result = _stream_multipart_file(
+        io.BytesIO(body), len(body), boundary.encode(), "file", lambda name: tmp_path / name
+    )
+
+    assert result == ("app.log", tmp_path / "app.log")
+    assert (tmp_path / "app.log").read_bytes() == content
+
+
+def test_missing_or_truncated_file_field_returns_none(tmp_path):
+    boundary = "b"
+    other = _multipart(boundary, [('Content-Disposition: form-data; name="note"', b"x")])
+    assert _stream_multipart_file(
+        io.BytesIO(other), len(other), b"b", "file", lambda name: tmp_path / name
+    ) is None
+
+    full = _multipart(boundary, [('Content-Disposition: form-data; name="file"; filename="a.log"', b"data" * 10)])
+    truncated = full[:-20]
+    assert _stream_multipart_file(
+        io.BytesIO(truncated), len(truncated), b"b", "file", lambda name: tmp_path / name
+    ) is None
+    assert not (tmp_path / "a.log").exists()
+
+
+def test_upload_store_evicts_least_recently_used():
+    store = UploadStore(max_entries=2)
+    store["a"] = {"path": "a"}
+    store["b"] = {"path": "b"}
+    assert store["a"]["path"] == "a"  # touch "a" so "b" is now the oldest
+    store["c"] = {"path": "c"}
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert len(store) == 2
+
+
+def test_upload_store_get_returns_none_once_evicted():
+    store = UploadStore(max_entries=2)
+    store["a"] = {"path": "a"}
+    store["b"] = {"path": "b"}
+    entry = store.get("a")  # touches "a" like indexing does
+    store["c"] = {"path": "c"}
+
+    assert entry == {"path": "a"}
+    assert store.get("b") is None
+    assert store.get("missing") is None
+    assert store.get("a") is entry
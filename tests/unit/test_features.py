@@ -4,6 +4,8 @@ Unit tests for feature extraction.
 Tests conversion of aggregated windows into feature vectors for anomaly detection.
 """
 
+import statistics
+
 import pytest
 from datetime import datetime, timezone, timedelta
 
@@ -15,6 +17,7 @@ from src.data.features import (
     extract_diversity_features,
     extract_features,
     extract_features_from_windows,
+    window_columns,
     FeatureTransformer,
 )
 
@@ -68,6 +71,27 @@ class TestCountFeatures:
         assert features["info_count"] == 2
         assert features["warning_count"] == 1
         assert features["error_count"] == 2  # ERROR + CRITICAL
+    
+    def test_count_features_from_prebuilt_columns(self):
+        """Test that prebuilt columns give the same counts as the window."""
+        ts_base = datetime(2025, 2, 7, 10, 30, 0, tzinfo=timezone.utc)
+        logs = [
+            LogEntry(timestamp=ts_base, level=level, service="api", message=f"Msg {i}")
+            for i, level in enumerate([LogLevel.INFO, LogLevel.ERROR, LogLevel.CRITICAL, LogLevel.DEBUG])
+        ]
+        window = AggregatedLogWindow(
+            window_start=ts_base,
+            window_end=ts_base + timedelta(minutes=5),
+            window_size_seconds=300,
+            service="api",
+            logs=logs
+        )
+        
+        columns = window_columns(window)
+        
+        assert columns.total == 4
+        assert columns.level_count(LogLevel.ERROR, LogLevel.CRITICAL) == 2
+        assert extract_count_features(window, columns) == extract_count_features(window)
 
 
 class TestRateFeatures:
@@ -338,6 +362,35 @@ class TestFeatureTransformer:
         assert stats["min"] == 0.05
         assert stats["max"] == 0.20
     
+    def test_feature_transformer_statistics_match_stdlib(self):
+        """Test that statistics agree with the statistics module."""
+        ts_base = datetime(2025, 2, 7, 10, 30, 0, tzinfo=timezone.utc)
+        counts = [3, 17, 8, 8, 42, 1, 25]
+        features = [
+            FeatureVector(
+                window_start=ts_base + timedelta(minutes=5 * i),
+                service="api",
+                total_events=100,
+                error_count=count,
+                warning_count=0,
+                info_count=100 - count,
+                error_rate=count / 100,
+                warning_rate=0.0,
+                unique_messages=10,
+                unique_error_codes=1
+            )
+            for i, count in enumerate(counts)
+        ]
+        rates = [count / 100 for count in counts]
+        
+        stats = FeatureTransformer(features).get_statistics("error_rate")
+        
+        assert stats["min"] == min(rates)
+        assert stats["max"] == max(rates)
+        assert stats["mean"] == pytest.approx(statistics.mean(rates))
+        assert stats["median"] == statistics.median(rates)
+        assert stats["stdev"] == pytest.approx(statistics.stdev(rates))
+    
     def test_feature_transformer_compare_to_baseline(self):
         """Test detecting anomalies vs baseline."""
         transformer = FeatureTransformer(self.features)
@@ -348,3 +401,31 @@ class TestFeatureTransformer:
         
         # Should detect the second vector (0.20) as anomalous
         assert len(anomalies) > 0
+    
+    def test_feature_transformer_compare_skips_missing_values(self):
+        """Test that anomaly indices point into features when values are None."""
+        ts_base = datetime(2025, 2, 7, 10, 30, 0, tzinfo=timezone.utc)
+        durations = [None, 100.0, None, 900.0, 120.0]
+        features = [
+            FeatureVector(
+                window_start=ts_base + timedelta(minutes=5 * i),
+                service="api",
+                total_events=10,
+                error_count=0,
+                warning_count=0,
+                info_count=10,
+                error_rate=0.0,
+                warning_rate=0.0,
+                median_duration_ms=duration,
+                unique_messages=5,
+                unique_error_codes=0
+            )
+            for i, duration in enumerate(durations)
+        ]
+        transformer = FeatureTransformer(features)
+        baseline = transformer.get_statistics("median_duration_ms")
+        
+        anomalies = transformer.compare_to_baseline("median_duration_ms", baseline)
+        
+        assert baseline["mean"] == pytest.approx(1120.0 / 3)
+        assert anomalies == [3]
@@ -5,6 +5,7 @@ Unit tests for Phase 3 incident context builder.
 from datetime import datetime, timezone, timedelta
 
 from src.anomaly.schema import AnomalyEvent, AnomalySeverity, FeatureAnomaly
+from src.data.schema import LogEntry, LogLevel
 
 from backend.incident.builder import IncidentBuilder
 from backend.incident.config import IncidentConfig
@@ -93,3 +94,62 @@ def test_operational_context_is_bounded():
     incidents = builder.build_incidents(events, operational_events=op_events)
     assert len(incidents[0].operational_context) == 1
 
+
+
+def test_services_are_never_grouped():
+    config = IncidentConfig(max_gap_seconds=600, require_feature_family_overlap=False)
+    builder = IncidentBuilder(config)
+    t0 = datetime(2025, 2, 7, 12, 0, tzinfo=timezone.utc)
+    events = [
+        _make_event("api", t0 + timedelta(seconds=120), "error_rate"),
+        _make_event("db", t0, "error_rate"),
+    ]
+
+    incidents = builder.build_incidents(events)
+    assert [i.service for i in incidents] == ["api", "db"]
+    assert all(i.metrics_summary.anomaly_count == 1 for i in incidents)
+
+
+def test_log_patterns_limited_to_context_window():
+    config = IncidentConfig(context_window_seconds=60, window_size_seconds=300)
+    builder = IncidentBuilder(config)
+    t0 = datetime(2025, 2, 7, 12, 0, tzinfo=timezone.utc)
+    events = [_make_event("api", t0, "error_rate")]
+
+    def _log(offset: int, message: str) -> LogEntry:
+        return LogEntry(
+            timestamp=t0 + timedelta(seconds=offset),
+            level=LogLevel.ERROR,
+            service="api",
+            message=message,
+        )
+
+    logs = [
+        _log(200, "timeout"),
+        _log(-120, "too early"),
+        _log(10, "timeout"),
+        _log(360, "refused"),
+        _log(500, "too late"),
+    ]
+
+    incidents = builder.build_incidents(events, logs_by_service={"api": logs})
+    patterns = incidents[0].log_patterns
+    assert [(p.key, p.count) for p in patterns] == [("timeout", 2), ("refused", 1)]
+
+
+def test_parallel_build_matches_serial():
+    t0 = datetime(2025, 2, 7, 12, 0, tzinfo=timezone.utc)
+    events = [
+        _make_event(service, t0 + timedelta(seconds=offset), "error_rate")
+        for service in ("api", "db", "web")
+        for offset in (0, 60, 3600)
+    ]
+
+    serial = IncidentBuilder().build_incidents(events)
+    parallel = IncidentBuilder(IncidentConfig(max_workers=2)).build_incidents(events)
+
+    def shape(incidents):
+        return [(i.service, i.start_time, i.end_time, len(i.anomalies)) for i in incidents]
+
+    assert shape(parallel) == shape(serial)
+    assert len(serial) == 6
@@ -0,0 +1,43 @@
+"""
+Unit tests for log ingestion.
+
+Tests that bulk text reads yield the same lines as streaming ingestion.
+"""
+
+import pytest
+
+from src.data.ingestion import LogIngestionError, TextLogSource
+
+
+class TestTextLogSourceBulk:
+    """Test TextLogSource.ingest_bulk against ingest()."""
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b"2025-02-07T10:30:45Z INFO api-server ok\n2025-02-07T10:30:46Z ERROR db down\n",
+            b"line one\r\nline two\r\n\r\nline three",
+            b"\n\n  padded line  \n\t\n\nlast\n\n",
+            b"before\x0cafter form feed\nnext\x0bvertical tab\n",
+            b"mac\rstyle\rbreaks\r",
+            b"unicode \xe2\x80\xa8 separator\n\xc2\x85 next line\n",
+            b"",
+        ],
+    )
+    def test_bulk_matches_streaming_lines(self, tmp_path, content):
+        """Test that ingest_bulk returns exactly ingest()'s raw lines."""
+        path = tmp_path / "app.log"
+        path.write_bytes(content)
+        source = TextLogSource(path)
+
+        expected = [entry["raw_line"] for entry in source.ingest()]
+
+        assert source.ingest_bulk() == expected
+
+    def test_bulk_read_failure_raises_ingestion_error(self, tmp_path):
+        """Test that undecodable files raise LogIngestionError."""
+        path = tmp_path / "app.log"
+        path.write_bytes(b"\xff\xfe not utf-8\n")
+
+        with pytest.raises(LogIngestionError):
+            TextLogSource(path).ingest_bulk()
@@ -0,0 +1,45 @@
+"""
+Unit tests for the local Mistral wrapper's generation helpers.
+"""
+
+from llm.mistral import _json_object_closed, _StopAtJsonEnd
+
+
+def test_json_object_closed_tracks_nesting_and_strings():
+    assert _json_object_closed('{"a": {"b": 1}} trailing')
+    assert _json_object_closed('Answer: {"note": "brace } and quote \\" inside"}')
+    assert not _json_object_closed('{"a": "}"')
+    assert not _json_object_closed('{"a": {"b": 1}')
+    assert not _json_object_closed("no json here")
+
+
+class _CharTokenizer:
+    """Decodes each id as one character and records what it was asked for."""
+
+    def __init__(self):
+        self.decoded = []
+
+    def decode(self, ids, skip_special_tokens=True):
+        text = "".join(chr(int(i)) for i in ids)
+        self.decoded.append(text)
+        return text
+
+
+def test_stop_at_json_end_scans_only_new_tokens_per_row():
+    import torch
+
+    tokenizer = _CharTokenizer()
+    prompt = "P{"
+    rows = ['{"a": "}"} tail', 'x {"b": {}} yyy']
+    criteria = _StopAtJsonEnd(tokenizer, prompt_length=len(prompt))
+
+    results = []
+    for step in range(1, len(rows[0]) + 1):
+        input_ids = torch.tensor([[ord(c) for c in prompt + row[:step]] for row in rows])
+        results.append(criteria(input_ids, None).tolist())
+
+    assert results[8] == [False, False]
+    assert results[9] == [True, False]
+    assert results[10] == [True, True]
+    # Every generated character was decoded exactly once, never the prompt.
+    assert all(len(text) == 1 for text in tokenizer.decoded)
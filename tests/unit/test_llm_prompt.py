@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 
 from backend.incident.schema import Incident, MetricsSummary
 from backend.incident.schema import LogPattern, OperationalEvent
-from llm.prompt import build_prompt
+from llm.prompt import PROMPT_PREFIX, build_prompt
 
 
 def _make_incident():
@@ -46,3 +46,23 @@ def test_prompt_contains_allowed_lists():
     assert "ALLOWED_EVIDENCE" in prompt
     assert "ALLOWED_STEPS" in prompt
     assert "RETURN_JSON_ONLY" in prompt
+
+
+def test_prompt_starts_with_shared_prefix():
+    incident = _make_incident()
+    prompt = build_prompt(incident, ["unknown"], ["service=api"], ["Check logs"])
+
+    assert prompt.startswith(PROMPT_PREFIX)
+    assert "inc-1" not in PROMPT_PREFIX
+
+
+def test_prompt_payload_follows_incident_copies():
+    incident = _make_incident()
+    first = build_prompt(incident, ["unknown"], ["service=api"], ["Check logs"])
+    again = build_prompt(incident, ["unknown"], ["service=api"], ["Check logs"])
+    copied = build_prompt(
+        incident.model_copy(update={"service": "db"}), ["unknown"], ["service=api"], ["Check logs"]
+    )
+
+    assert first == again
+    assert '"service": "db"' in copied
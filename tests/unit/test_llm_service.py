@@ -4,9 +4,11 @@ Unit tests for LLM service validation and fallback.
 
 from datetime import datetime, timezone
 
-from backend.incident.schema import Incident, MetricsSummary
+from backend.incident.schema import Incident, MetricsSummary, OperationalEvent
+from src.anomaly.schema import AnomalyEvent, AnomalySeverity, FeatureAnomaly
 from llm.schema import Explanation
 from backend.llm_service import IncidentExplanationService
+from llm.prompt import build_prompt
 
 
 class _FakeModel:
@@ -63,3 +65,111 @@ def test_rejects_disallowed_values():
 
     assert explanation.probable_causes == ["unknown"]
     assert explanation.confidence_score == 0.0
+
+
+def test_parses_answer_after_echoed_prompt():
+    incident = _make_incident()
+    answer = """
+    {
+        "incident_id": "inc-1",
+        "summary": "This is a test summary with enough length.",
+        "probable_causes": ["unknown"],
+        "supporting_evidence": ["service=api"],
+        "confidence_score": 0.5,
+        "recommended_next_steps": ["Validate incident scope and confirm if impact persists"],
+        "limitations": "Test limitations with enough length."
+    }
+    """
+    echoed = build_prompt(incident, ["unknown"], ["service=api"], ["Check logs"]) + answer
+    service = IncidentExplanationService(model=_FakeModel(echoed))
+    explanation = service.explain(incident)
+
+    assert explanation.summary == "This is a test summary with enough length."
+    assert explanation.confidence_score == 0.5
+
+
+def test_parses_fenced_answer_with_trailing_prose():
+    incident = _make_incident()
+    raw = """```json
+    {
+        "incident_id": "inc-1",
+        "summary": "This is a test summary with enough length.",
+        "probable_causes": ["unknown"],
+        "supporting_evidence": ["service=api"],
+        "confidence_score": 0.5,
+        "recommended_next_steps": ["Validate incident scope and confirm if impact persists"],
+        "limitations": "Test limitations with enough length."
+    }
+    ```
+    Note: values such as {service} were taken from the facts above.
+    """
+    service = IncidentExplanationService(model=_FakeModel(raw))
+    explanation = service.explain(incident)
+
+    assert explanation.confidence_score == 0.5
+
+
+def test_allowed_causes_follow_features_and_deployments():
+    incident = _make_incident()
+    t0 = incident.start_time
+    anomalies = [
+        FeatureAnomaly(
+            feature=feature,
+            observed=1.0,
+            baseline_mean=0.5,
+            baseline_std=0.1,
+            score=0.6,
+            severity=AnomalySeverity.HIGH,
+            direction="high",
+        )
+        for feature in ("error_rate", "p95_duration_ms", "max_duration_ms")
+    ]
+    events = [
+        AnomalyEvent(
+            service="api",
+            window_start=t0,
+            detected_at=t0,
+            severity=AnomalySeverity.HIGH,
+            score=0.6,
+            anomalies=anomalies,
+        )
+    ]
+    deploys = [OperationalEvent(event_type="Deployment", timestamp=t0, description="Deploy v2")]
+    incident = incident.model_copy(update={"anomalies": events, "operational_context": deploys})
+
+    service = IncidentExplanationService(model=_FakeModel(""))
+    assert service._allowed_causes(incident) == [
+        "deployment_change",
+        "error_rate_spike",
+        "latency_regression",
+        "unknown",
+    ]
+
+
+def test_explain_batch_uses_generate_batch_in_order():
+    class _BatchModel(_FakeModel):
+        def generate_batch(self, prompts):
+            self.batches = getattr(self, "batches", []) + [len(prompts)]
+            return [self._output, "not json"]
+
+    first = _make_incident()
+    second = first.model_copy(update={"incident_id": "inc-2"})
+    valid = """
+    {
+        "incident_id": "inc-1",
+        "summary": "This is a test summary with enough length.",
+        "probable_causes": ["unknown"],
+        "supporting_evidence": ["service=api"],
+        "confidence_score": 0.5,
+        "recommended_next_steps": ["Validate incident scope and confirm if impact persists"],
+        "limitations": "Test limitations with enough length."
+    }
+    """
+    model = _BatchModel(valid)
+    service = IncidentExplanationService(model=model)
+    explanations = service.explain_batch([first, second])
+
+    assert model.batches == [2]
+    assert explanations[0].confidence_score == 0.5
+    assert explanations[1].incident_id == "inc-2"
+    assert explanations[1].probable_causes == ["unknown"]
@@ -4,10 +4,14 @@ Unit tests for LoRA training dataset schema utilities.
 
 from datetime import datetime, timezone
 
-from backend.incident.schema import Incident, MetricsSummary
+from backend.incident.schema import Incident, LogPattern, MetricsSummary, OperationalEvent
+from backend.llm_service import IncidentExplanationService
+from llm.prompt import build_prompt
 from llm.schema import Explanation
+from llm.training import dataset
 from llm.training.schema import TrainingSample
-from llm.training.dataset import build_training_prompt, format_completion
+from llm.training.dataset import build_training_prompt, format_completion, iter_training_samples
+from src.anomaly.schema import AnomalyEvent, AnomalySeverity, FeatureAnomaly
 
 
 def _make_sample():
@@ -46,3 +50,109 @@ def test_training_prompt_and_completion():
     assert "RETURN_JSON_ONLY" in prompt
     assert completion.startswith("{")
     assert "incident_id" in completion
+
+
+def test_iter_training_samples_streams_jsonl(tmp_path):
+    sample = _make_sample()
+    path = tmp_path / "train.jsonl"
+    line = sample.model_dump_json()
+    path.write_text(f"{line}\n\n{line}\n", encoding="utf-8")
+
+    samples = iter_training_samples(str(path))
+
+    assert not isinstance(samples, list)
+    assert [s.incident.incident_id for s in samples] == ["inc-1", "inc-1"]
+
+
+class _CharTokenizer:
+    """One token per character, enough to exercise label masking."""
+
+    def __call__(self, texts, truncation=False, max_length=None):
+        input_ids = [[ord(c) for c in text] for text in texts]
+        if truncation:
+            input_ids = [ids[:max_length] for ids in input_ids]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+
+def test_tokenize_batch_masks_prompt_and_drops_truncated_completions():
+    from llm.training.train_lora import _IGNORE_INDEX, _tokenize_batch
+
+    batch = {"prompt": ["abc", "abcdefgh", "abcdef"], "completion": ["{}", "{}", "{}"]}
+
+    rows = _tokenize_batch(batch, _CharTokenizer(), max_length=7)
+
+    # The second prompt alone fills max_length; the third keeps one label token.
+    assert rows["input_ids"] == [[ord(c) for c in "abc{}"], [ord(c) for c in "abcdef{"]]
+    assert rows["labels"] == [
+        [_IGNORE_INDEX] * 3 + [ord("{"), ord("}")],
+        [_IGNORE_INDEX] * 6 + [ord("{")],
+    ]
+    assert rows["length"] == [5, 7]
+
+
+def _rich_incident(incident):
+    t0 = incident.start_time
+    anomalies = [
+        FeatureAnomaly(
+            feature=feature,
+            observed=1.0,
+            baseline_mean=0.5,
+            baseline_std=0.1,
+            score=0.6,
+            severity=AnomalySeverity.HIGH,
+            direction=direction,
+        )
+        for feature, direction in (
+            ("error_rate", "high"),
+            ("p95_duration_ms", "high"),
+            ("unique_messages", "low"),
+        )
+    ]
+    # Two events share a window, so window/severity/feature entries repeat.
+    events = [
+        AnomalyEvent(
+            service="api",
+            window_start=window_start,
+            detected_at=window_start,
+            severity=AnomalySeverity.HIGH,
+            score=0.6,
+            anomalies=anomalies,
+        )
+        for window_start in (t0, t0, t0.replace(minute=5))
+    ]
+    patterns = [LogPattern(key="abc123", count=4), LogPattern(key="def456", count=1)]
+    ops = [
+        OperationalEvent(event_type="Deployment", timestamp=t0, description="Deploy v2"),
+        OperationalEvent(event_type="config_change", timestamp=t0, description="Flag flip"),
+    ]
+    return incident.model_copy(
+        update={"anomalies": events, "log_patterns": patterns, "operational_context": ops}
+    )
+
+
+def test_training_and_inference_build_the_same_allowed_lists():
+    sample = _make_sample()
+    incident = _rich_incident(sample.incident)
+    sample = sample.model_copy(update={"incident": incident})
+
+    prompts = []
+
+    class _CapturingModel:
+        def generate(self, prompt):
+            prompts.append(prompt)
+            return "not json"
+
+    service = IncidentExplanationService(model=_CapturingModel())
+
+    causes = dataset._allowed_causes(incident)
+    assert causes == service._allowed_causes(incident)
+    assert "deployment_change" in causes
+    # build_prompt sorts evidence, so only the contents must agree.
+    evidence = dataset._allowed_evidence(incident)
+    assert sorted(evidence) == sorted(service._allowed_evidence(incident))
+    assert len(evidence) == len(set(evidence))
+    assert dataset._allowed_steps(incident, causes) == service._allowed_steps(incident, causes)
+
+    service.explain(incident)
+    assert build_training_prompt(sample) == prompts[0]
+    assert prompts[0] == build_prompt(incident, *service._allowed_options(incident))
@@ -63,6 +63,20 @@ class TestNormalizeTimestamp:
         assert result.year == 2024
         assert result.tzinfo == timezone.utc
     
+    def test_normalize_fractional_and_unpadded_formats(self):
+        """Test fractional seconds and strptime-only unpadded fields."""
+        result = normalize_timestamp("2025-02-07T10:30:45.5Z")
+        
+        assert result.microsecond == 500000
+        assert result.tzinfo == timezone.utc
+        assert normalize_timestamp("2025-2-7T9:05:03") == \
+            datetime(2025, 2, 7, 9, 5, 3, tzinfo=timezone.utc)
+    
+    def test_normalize_offset_timestamp_rejected(self):
+        """Test that explicit UTC offsets are not silently accepted."""
+        with pytest.raises(NormalizationError):
+            normalize_timestamp("2025-02-07T10:30:45+05:00")
+    
     def test_normalize_invalid_timestamp(self):
         """Test that invalid timestamp raises error."""
         with pytest.raises(NormalizationError):